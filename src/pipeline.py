@@ -4,12 +4,15 @@ CLI tool for estimating solar irradiance on buildings from digital surface model
 """
 
 import argparse
-import platform
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from utils.building_outlines import (
+    apply_building_mask,
+    building_mask_raster_name,
+    building_outlines_fingerprint,
     calculate_outline_raster,
     export_final_raster,
     load_building_outlines,
@@ -19,36 +22,29 @@ from utils.dsm import (
     calculate_horizon_raster,
     calculate_slope_aspect_rasters,
     combine_horizon_rasters,
-    filter_raster_by_slope,
-    load_virtual_raster_into_grass,
-    merge_rasters,
+    dsm_fingerprint,
+    merge_rasters_native,
 )
-from utils.grass_utils import setup_grass
+from utils.grass_utils import default_gisbase, remove_rasters, setup_grass
 from utils.logging_config import get_logger, setup_logging
 from utils.misc import calculate_tif_size_MB, generate_duration_message, get_dir_size_MB
+from utils.raster_export import (
+    DEFAULT_COMPRESSION,
+    GEOTIFF_COMPRESSIONS,
+    export_geotiff,
+)
 from utils.solar_irradiance import (
-    calculate_solar_coefficients,
     calculate_solar_irradiance_interpolated,
+    day_raster_pattern,
 )
-from utils.stats import create_stats
+from utils.stats import STATS_ENGINES, create_stats
 from utils.wrf import (
-    calculate_wrf_adjusted_per_day,
+    calculate_wrf_adjusted_total,
     calculate_wrf_on_buildings,
-    cleanup_wrf_intermediates,
     process_wrf_for_grass,
 )
 
 
-def detect_grass_base():
-    """Auto-detect GRASS GIS installation path based on operating system."""
-    if platform.system() == "Darwin":
-        return "/Applications/GRASS-8.4.app/Contents/Resources"
-    elif platform.system() == "Linux":
-        return "/usr/lib/grass84"
-    else:
-        return None
-
-
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Estimate solar irradiance on buildings from DSM data",
@@ -91,6 +87,12 @@ def parse_args():
         help='Prefix for output files (default: "solar_on_buildings")',
     )
 
+    parser.add_argument(
+        "--materialize-dsm",
+        action="store_true",
+        help="Copy the DSM tiles into a native GRASS raster once, instead of decoding the GeoTIFF tiles on every pass",
+    )
+
     parser.add_argument(
         "--max-slope",
         type=float,
@@ -98,6 +100,26 @@ def parse_args():
         help="Maximum slope in degrees for filtering (default: 45.0)",
     )
 
+    parser.add_argument(
+        "--mask-irradiance",
+        action="store_true",
+        help="Run r.sun only on building pixels by masking to the building outlines. Much faster for sparse urban areas, but shading from masked terrain is ignored unless --calculate-horizon is also used",
+    )
+
+    parser.add_argument(
+        "--slope-aspect-precision",
+        choices=["FCELL", "CELL"],
+        default="FCELL",
+        help="Raster type for slope and aspect: FCELL (float) or CELL (whole degrees, half the size) (default: FCELL)",
+    )
+
+    parser.add_argument(
+        "--slope-aspect-tile-size",
+        type=int,
+        default=None,
+        help="Split slope/aspect into tiles of this many cells per side, processed in parallel (default: one threaded run)",
+    )
+
     parser.add_argument(
         "--key-days",
         type=int,
@@ -113,12 +135,68 @@ def parse_args():
         help="Time step when computing all-day radiation sums in decimal hours (default: 1.0)",
     )
 
+    parser.add_argument(
+        "--sum-engine",
+        choices=["mapcalc", "numpy"],
+        default="mapcalc",
+        help="How to compute the weighted irradiance sum: r.mapcalc or NumPy arrays (default: mapcalc)",
+    )
+
+    parser.add_argument(
+        "--nprocs",
+        type=int,
+        default=None,
+        help="Total number of threads for r.sun, split between concurrent key days (default: number of CPUs, capped at 16 when key days run one at a time)",
+    )
+
+    parser.add_argument(
+        "--parallel-days",
+        type=int,
+        default=None,
+        help="Number of key days to run r.sun for concurrently, splitting its threads between them (default: one per 16 CPUs)",
+    )
+
+    parser.add_argument(
+        "--r-sun-tile-size",
+        type=int,
+        default=None,
+        help="Split each r.sun run into tiles of this many cells per side, run as parallel processes (default: one threaded run per day)",
+    )
+
+    parser.add_argument(
+        "--r-sun-tile-overlap",
+        type=int,
+        default=None,
+        help="Overlap in cells between r.sun tiles (default: shadow length from the DSM's height range, capped at a quarter of the tile size; 0 with --calculate-horizon)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for caching r.sun results per key day, reused when the DSM and settings are unchanged (default: no caching)",
+    )
+
+    parser.add_argument(
+        "--stats-engine",
+        choices=list(STATS_ENGINES),
+        default="univar",
+        help="How per-building sums are computed: a single pass over a building raster with r.univar (univar) or NumPy (numpy), or v.rast.stats (grass) (default: univar)",
+    )
+
     parser.add_argument(
         "--export-rasters",
         action="store_true",
         help="Export rasters (solar irradiance, coefficient, WRF adjusted, final) as GeoTIFFs",
     )
 
+    parser.add_argument(
+        "--compression",
+        type=str.upper,
+        choices=list(GEOTIFF_COMPRESSIONS),
+        default=DEFAULT_COMPRESSION,
+        help=f"Compression for exported GeoTIFFs (default: {DEFAULT_COMPRESSION})",
+    )
+
     # Horizon pre-calculation arguments
     parser.add_argument(
         "--calculate-horizon",
@@ -205,13 +283,10 @@ def main():
     # Auto-detect or validate GRASS base path
     grass_base = args.grass_base
     if grass_base is None:
-        grass_base = detect_grass_base()
-        if grass_base is None:
-            logger.error(
-                "Could not auto-detect GRASS GIS installation for %s. "
-                "Please provide --grass-base argument.",
-                platform.system(),
-            )
+        try:
+            grass_base = default_gisbase()
+        except EnvironmentError as e:
+            logger.error("%s. Please provide --grass-base argument.", e)
             sys.exit(1)
         logger.info("Auto-detected GRASS GIS at: %s", grass_base)
 
@@ -228,19 +303,54 @@ def main():
     remove_masks(grass_module=Module)
 
     logger.info("Merging rasters from: %s", args.dsm_glob)
-    merged_virtual_raster = merge_rasters(
-        dsm_file_glob=args.dsm_glob, area_name=args.area_name, output_dir=output_dir
-    )
-
-    logger.info("Loading virtual raster into GRASS...")
-    virtual_raster = load_virtual_raster_into_grass(
-        input_vrt=merged_virtual_raster,
+    virtual_raster = merge_rasters_native(
+        dsm_file_glob=args.dsm_glob,
         output_name=f"{args.area_name}_dsm",
         grass_module=Module,
+        materialize=args.materialize_dsm,
     )
 
-    logger.info("Calculating slope and aspect...")
-    aspect, slope = calculate_slope_aspect_rasters(dsm=virtual_raster, grass_module=Module)
+    # Slope/aspect, the building outline import and the WRF import only depend
+    # on the DSM being loaded, so run them concurrently
+    wrf_day_rasters, wrf_summed = None, None
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        logger.info("Calculating slope and aspect...")
+        slope_aspect_future = executor.submit(
+            calculate_slope_aspect_rasters,
+            dsm=virtual_raster,
+            grass_module=Module,
+            precision=args.slope_aspect_precision,
+            tile_size=args.slope_aspect_tile_size,
+        )
+
+        logger.info("Loading building outlines...")
+        outlines_future = executor.submit(
+            load_building_outlines,
+            args.building_dir,
+            args.building_layer_name,
+            grass_module=Module,
+        )
+
+        wrf_future = None
+        if args.wrf_file:
+            logger.info("Processing WRF data from: %s", args.wrf_file)
+            wrf_future = executor.submit(
+                process_wrf_for_grass,
+                nc_file_path=args.wrf_file,
+                output_prefix="wrf_swdown",
+                grass_module=Module,
+                source_crs=args.source_crs,
+                target_crs=args.target_crs,
+                # Every day the interpolation covers, for the per-day coefficients
+                days=range(min(args.key_days), max(args.key_days) + 1),
+                clip_to_raster=virtual_raster,
+                print_diagnostics=False,
+            )
+
+        aspect, slope = slope_aspect_future.result()
+        outlines = outlines_future.result()
+        if wrf_future is not None:
+            wrf_day_rasters, wrf_summed = wrf_future.result()
 
     # Horizon pre-calculation (optional, opt-in via --calculate-horizon)
     horizon = None
@@ -262,17 +372,11 @@ def main():
 
         if args.dem_glob:
             logger.info("Merging DEM rasters from: %s", args.dem_glob)
-            merged_dem_vrt = merge_rasters(
+            dem_raster = merge_rasters_native(
                 dsm_file_glob=args.dem_glob,
-                area_name=f"{args.area_name}_dem",
-                output_dir=output_dir,
-            )
-
-            logger.info("Loading DEM virtual raster into GRASS...")
-            dem_raster = load_virtual_raster_into_grass(
-                input_vrt=merged_dem_vrt,
                 output_name=f"{args.area_name}_dem",
                 grass_module=Module,
+                set_region=False,
             )
 
             logger.info(
@@ -323,14 +427,38 @@ def main():
                 for horizon_map in sorted(horizon_maps):
                     out_name = f"{horizon_map}.tif"
                     logger.info("Exporting %s -> %s", horizon_map, out_name)
-                    Module(
-                        "r.out.gdal",
-                        input=horizon_map,
-                        output=str(output_dir / out_name),
-                        format="GTiff",
-                        createopt="TFW=YES,COMPRESS=LZW",
-                        overwrite=True,
-                    ).run()
+                    export_geotiff(
+                        horizon_map,
+                        str(output_dir / out_name),
+                        grass_module=Module,
+                        compression=args.compression,
+                    )
+
+    # Identify the inputs behind the DSM-derived rasters, so cached r.sun
+    # results are only reused for the same tiles and settings
+    r_sun_cache_key = ""
+    if args.cache_dir:
+        cache_inputs = [dsm_fingerprint(args.dsm_glob), args.slope_aspect_precision]
+        if args.mask_irradiance:
+            cache_inputs += ["mask", building_outlines_fingerprint(args.building_dir)]
+        if args.r_sun_tile_size is not None:
+            # Tiled runs only approximate shadows across tile edges
+            cache_inputs += ["tiles", args.r_sun_tile_size, args.r_sun_tile_overlap]
+        if args.calculate_horizon:
+            cache_inputs += [
+                args.dsm_buffer_distance,
+                args.horizon_start_azimuth,
+                args.horizon_end_azimuth,
+            ]
+            if args.dem_glob:
+                cache_inputs += [dsm_fingerprint(args.dem_glob), args.dem_buffer_distance]
+        r_sun_cache_key = "|".join(map(str, cache_inputs))
+
+    if args.mask_irradiance:
+        # r.sun skips NULL (masked) cells, so only building pixels are computed.
+        # Horizon rasters above were calculated without the mask.
+        logger.info("Masking solar irradiance calculation to building outlines...")
+        apply_building_mask(outlines, grass_module=Module)
 
     logger.info("Calculating solar irradiance (interpolated) for days: %s", args.key_days)
     day_irradiance_rasters, solar_irradiance = calculate_solar_irradiance_interpolated(
@@ -344,73 +472,48 @@ def main():
         output_dir=output_dir,
         horizon=horizon,
         horizon_step_degrees=args.horizon_step_degrees,
+        # The per-day rasters are only needed for the WRF coefficients
+        keep_day_rasters=bool(args.wrf_file),
+        sum_engine=args.sum_engine,
+        parallel_days=args.parallel_days,
+        nprocs=args.nprocs,
+        compression=args.compression,
+        cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+        cache_key=r_sun_cache_key,
+        tile_size=args.r_sun_tile_size,
+        tile_overlap=args.r_sun_tile_overlap,
+        # r.sun tiles run in their own mapsets, outside the active mask
+        tile_mask=building_mask_raster_name(outlines) if args.mask_irradiance else None,
     )
 
-    logger.info("Loading building outlines...")
-    outlines = load_building_outlines(
-        args.building_dir, args.building_layer_name, grass_module=Module
+    logger.info(
+        "Calculating solar irradiance on buildings (max slope: %s°)...", args.max_slope
     )
-
-    logger.info("Calculating solar irradiance on buildings...")
-    solar_on_buildings = calculate_outline_raster(
+    solar_on_buildings_filtered = calculate_outline_raster(
         solar_irradiance_raster=solar_irradiance,
         building_vector=outlines,
-        output_name=args.output_prefix,
+        output_name=f"{args.output_prefix}_filtered",
         grass_module=Module,
-    )
-
-    logger.info("Filtering by slope (max: %s°)...", args.max_slope)
-    solar_on_buildings_filtered = filter_raster_by_slope(
-        input_raster=solar_on_buildings,
         slope_raster=slope,
         max_slope_degrees=args.max_slope,
-        output_name=f"{args.output_prefix}_filtered",
-        grass_module=Module,
     )
 
+    # Rasters to remove once the outputs have been written (in addition to the
+    # per-day irradiance rasters, which are removed by pattern)
+    intermediate_rasters = []
+
     # WRF processing (optional)
-    day_coefficient_rasters = None
     wrf_adjusted = None
 
     if args.wrf_file:
-        logger.info("Calculating per-day solar coefficients...")
-        day_coefficient_rasters = calculate_solar_coefficients(
-            day_irradiance_rasters=rooftop_day_irradiance_rasters,
-            dsm=virtual_raster,
-            grass_module=Module,
-        )
-
-        logger.info("Processing WRF data from: %s", args.wrf_file)
-        wrf_day_rasters, wrf_summed = process_wrf_for_grass(
-            nc_file_path=args.wrf_file,
-            output_prefix="wrf_swdown",
-            grass_module=Module,
-            source_crs=args.source_crs,
-            target_crs=args.target_crs,
-            days=args.key_days,
-            clip_to_raster=virtual_raster,
-            print_diagnostics=False,
-        )
-
-        logger.info("Applying per-day solar coefficients to WRF data...")
-        adjusted_day_rasters = calculate_wrf_adjusted_per_day(
+        logger.info("Applying per-day solar coefficients to WRF data and summing...")
+        wrf_adjusted_total = calculate_wrf_adjusted_total(
             wrf_day_rasters=wrf_day_rasters,
-            coefficient_rasters=day_coefficient_rasters,
+            irradiance_rasters=day_irradiance_rasters,
+            output_name="wrf_adjusted_total",
             grass_module=Module,
-            output_prefix="wrf_adjusted",
         )
 
-        logger.info("Summing adjusted WRF rasters...")
-        adjusted_raster_list = list(adjusted_day_rasters.values())
-        wrf_adjusted_total = "wrf_adjusted_total"
-        Module(
-            "r.series",
-            input=",".join(adjusted_raster_list),
-            output=wrf_adjusted_total,
-            method="sum",
-            overwrite=True,
-        ).run()
-
         logger.info("Calculating WRF on buildings...")
         wrf_adjusted = calculate_wrf_on_buildings(
             wrf_summed_raster=wrf_adjusted_total,
@@ -419,68 +522,64 @@ def main():
             grass_module=Module,
         )
 
-        # Clean up intermediate rasters
-        cleanup_wrf_intermediates(wrf_day_rasters, wrf_summed, Module)
-        Module(
-            "g.remove",
-            type="raster",
-            name=",".join(adjusted_raster_list),
-            flags="f",
-        ).run()
-        Module(
-            "g.remove",
-            type="raster",
-            name=wrf_adjusted_total,
-            flags="f",
-        ).run()
+        intermediate_rasters.extend([*wrf_day_rasters.values(), wrf_summed, wrf_adjusted_total])
 
         if args.export_rasters:
             logger.info("Exporting WRF adjusted raster...")
-            Module(
-                "r.out.gdal",
-                input=wrf_adjusted,
-                output=str(output_dir / f"{args.area_name}_wrf_adjusted.tif"),
-                format="GTiff",
-                createopt="TFW=YES,COMPRESS=LZW",
-                overwrite=True,
-            ).run()
+            wrf_adjusted_tif = str(output_dir / f"{args.area_name}_wrf_adjusted.tif")
+            export_geotiff(
+                wrf_adjusted,
+                wrf_adjusted_tif,
+                grass_module=Module,
+                compression=args.compression,
+                overviews=True,
+            )
 
-    logger.info("Cleaning up intermediate rasters...")
-    Module(
-        "g.remove",
-        type="raster",
-        name=",".join(day_irradiance_rasters.values()),
-        flags="f",
-    ).run()
-
-    if day_coefficient_rasters:
-        Module(
-            "g.remove",
-            type="raster",
-            name=",".join(day_coefficient_rasters.values()),
-            flags="f",
-        ).run()
-
-    if args.export_rasters:
-        logger.info("Exporting final raster...")
-        export_final_raster(
-            raster_name=solar_on_buildings_filtered,
-            slope=slope,
-            aspect=aspect,
-            output_tif=f"{args.area_name}_solar_irradiance_on_buildings.tif",
-            grass_module=Module,
+    # v.rast.stats temporarily renames an active mask out of the way, which
+    # would race with the export below, so drop it before running them together
+    remove_masks(grass_module=Module)
+
+    # The final GeoTIFF and the building statistics read the same rasters but
+    # write disjoint outputs, so produce them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        export_future = None
+        if args.export_rasters:
+            logger.info("Exporting final raster...")
+            export_future = executor.submit(
+                export_final_raster,
+                raster_name=solar_on_buildings_filtered,
+                slope=slope,
+                aspect=aspect,
+                output_tif=f"{args.area_name}_solar_irradiance_on_buildings.tif",
+                grass_module=Module,
+                output_dir=output_dir,
+                compression=args.compression,
+            )
+
+        logger.info("Generating statistics...")
+        stats_future = executor.submit(
+            create_stats,
+            area=args.area_name,
+            building_outlines=outlines,
             output_dir=output_dir,
+            rooftop_raster=solar_on_buildings_filtered,
+            wrf_raster=wrf_adjusted,
+            output_csv=True,
+            grass_module=Module,
+            engine=args.stats_engine,
         )
 
-    logger.info("Generating statistics...")
-    create_stats(
-        area=args.area_name,
-        building_outlines=outlines,
-        output_dir=output_dir,
-        rooftop_raster=f"{args.output_prefix}_filtered",
-        wrf_raster=wrf_adjusted,
-        output_csv=True,
+        if export_future is not None:
+            export_future.result()
+        stats_future.result()
+
+    logger.info("Cleaning up intermediate rasters...")
+    # The outlines rasterized on import, for masking
+    intermediate_rasters.append(building_mask_raster_name(outlines))
+    remove_rasters(
+        intermediate_rasters,
         grass_module=Module,
+        pattern=day_raster_pattern(virtual_raster),
     )
 
     elapsed_time = time.time() - start_time
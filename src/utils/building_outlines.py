@@ -9,18 +9,62 @@ solar irradiance) together with slope and aspect bands.
 """
 
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from utils.logging_config import get_logger
+from utils.misc import files_fingerprint
+from utils.raster_export import DEFAULT_COMPRESSION, export_cog
 
 logger = get_logger(__name__)
 
+# Building vector the active `r.mask` was created from, so repeated calls to
+# `apply_building_mask` with the same vector don't re-rasterize it. Holds at
+# most one entry, and is cleared whenever the mask is removed or replaced.
+_MASK_CACHE: Dict[str, bool] = {}
+
+# Building vector -> raster rasterized from it by `load_building_outlines`
+_MASK_RASTERS: Dict[str, str] = {}
+
+
+def building_mask_raster_name(building_vector: str) -> str:
+    """Return the name of the mask raster created for `building_vector`."""
+    return f"{building_vector}_mask"
+
+
+def building_outlines_fingerprint(shapefile: str) -> str:
+    """Return a short hash identifying the building outline files at `shapefile`.
+
+    Covers every file under the directory (or the file itself, or a zipped
+    `<shapefile>.zip` when the directory doesn't exist), by path, size and
+    modification time, so replacing the outlines in place changes the hash.
+    It is used to key cached results that depend on the buildings.
+
+    Args:
+        shapefile: Path to the building footprints, as given to
+            `load_building_outlines`.
+
+    Returns:
+        The hash as a hex string.
+    """
+    path = Path(shapefile)
+    if not path.exists() and Path(f"{shapefile}.zip").exists():
+        path = Path(f"{shapefile}.zip")
+
+    if path.is_dir():
+        files = [str(f) for f in path.rglob("*") if f.is_file()]
+    else:
+        files = [str(path)]
+    return files_fingerprint(files)
+
 
 def load_building_outlines(shapefile: str, output_name: str, grass_module: Any) -> str:
     """Import building outlines (vector) from a shapefile into GRASS.
 
     This uses the `v.in.ogr` GRASS module to import a vector dataset from a
-    shapefile into the current GRASS mapset.
+    shapefile into the current GRASS mapset. The outlines are also rasterized
+    once with `v.to.rast` (value 1 inside buildings) in the current region, so
+    `apply_building_mask` can activate the mask from that raster without
+    rasterizing every polygon again.
 
     Args:
         shapefile: Path to the directory containing a building footprints shapefile.
@@ -34,6 +78,23 @@ def load_building_outlines(shapefile: str, output_name: str, grass_module: Any)
     v_in = grass_module("v.in.ogr", input=shapefile, output=output_name, overwrite=True)
     v_in.run()
 
+    # A mask built from a previous import under this name is now stale
+    _MASK_CACHE.pop(output_name, None)
+
+    # Rasterize the outlines once for use as a mask
+    mask_raster = building_mask_raster_name(output_name)
+    v_to_rast = grass_module(
+        "v.to.rast",
+        input=output_name,
+        output=mask_raster,
+        type="area",
+        use="val",
+        value=1,
+        overwrite=True,
+    )
+    v_to_rast.run()
+    _MASK_RASTERS[output_name] = mask_raster
+
     return output_name
 
 
@@ -42,7 +103,10 @@ def apply_building_mask(building_vector: str, grass_module: Any) -> None:
 
     The mask created by `r.mask` restricts subsequent raster operations to the
     area covered by the given vector. Typical workflows call this beforehand to copy
-    or compute values only for buildings.
+    or compute values only for buildings. If the active mask was already created
+    from `building_vector`, it is reused rather than rasterized again. Vectors
+    imported with `load_building_outlines` use their pre-rasterized mask raster;
+    other vectors are rasterized by `r.mask` itself.
 
     Args:
         building_vector: Name of the building footprint vector in GRASS.
@@ -52,10 +116,20 @@ def apply_building_mask(building_vector: str, grass_module: Any) -> None:
     Returns:
         None
     """
-    # Create a raster mask from the vector; overwrite any existing mask
-    r_mask = grass_module("r.mask", vector=building_vector, overwrite=True)
+    if building_vector in _MASK_CACHE:
+        return
+
+    # Create the mask from the building raster (or vector); overwrite any existing mask
+    mask_raster = _MASK_RASTERS.get(building_vector)
+    if mask_raster is not None:
+        r_mask = grass_module("r.mask", raster=mask_raster, overwrite=True)
+    else:
+        r_mask = grass_module("r.mask", vector=building_vector, overwrite=True)
     r_mask.run()
 
+    _MASK_CACHE.clear()
+    _MASK_CACHE[building_vector] = True
+
 
 def remove_masks(grass_module: Any) -> None:
     """Remove any active raster mask(s) in the current GRASS session.
@@ -71,6 +145,8 @@ def remove_masks(grass_module: Any) -> None:
     Raises:
         Exception: if removing the mask encounters an error.
     """
+    _MASK_CACHE.clear()
+
     try:
         # The 'r' flag removes the active mask
         r_mask = grass_module("r.mask", flags="r")
@@ -84,28 +160,72 @@ def calculate_outline_raster(
     building_vector: str,
     output_name: str,
     grass_module: Any,
+    slope_raster: Optional[str] = None,
+    max_slope_degrees: Optional[float] = None,
 ) -> str:
     """Create a raster containing values only for building outlines.
 
+    The copy runs in a computational region shrunk to the bounding box of
+    `building_vector` (aligned to the source raster's grid), so `r.mapcalc`
+    doesn't scan the parts of the DSM without buildings. The `g.region` and
+    `r.mapcalc` calls are chained in one pygrass `MultiModule` with a
+    temporary region, so the caller's region is left untouched.
+
+    When `slope_raster` and `max_slope_degrees` are given, the slope filter is
+    applied in the same `r.mapcalc` pass as the building mask, so pixels steeper
+    than `max_slope_degrees` are set to NULL without writing an intermediate
+    unfiltered raster.
+
+    For vectors imported with `load_building_outlines`, the pre-rasterized
+    building raster is tested in the expression itself, so no `r.mask` has to
+    be created. Other vectors are masked with `r.mask` first.
+
     Args:
         solar_irradiance_raster: Name of the solar irradiance raster to be masked.
         building_vector: Name of the building footprint vector to use for masking.
         output_name: Name to assign to the resulting building-only raster.
         grass_module: The GRASS Python scripting Module class.
+        slope_raster: Optional name of the slope raster (degrees) to filter by.
+        max_slope_degrees: Optional maximum allowed slope (inclusive). Only used
+            together with `slope_raster`.
 
     Returns:
         The GRASS raster name.
     """
-    # Apply mask using the building vector
-    apply_building_mask(building_vector, grass_module=grass_module)
+    conditions = []
 
-    # Copy values from the source raster into the masked output raster
-    r_mapcalc = grass_module(
-        "r.mapcalc",
-        expression=f"{output_name} = {solar_irradiance_raster}",
-        overwrite=True,
+    mask_raster = _MASK_RASTERS.get(building_vector)
+    if mask_raster is not None:
+        # Test the building raster directly instead of creating a MASK
+        conditions.append(f"!isnull({mask_raster})")
+    else:
+        apply_building_mask(building_vector, grass_module=grass_module)
+
+    if slope_raster is not None and max_slope_degrees is not None:
+        # Drop pixels that are too steep in the same pass
+        conditions.append(f"{slope_raster} <= {max_slope_degrees}")
+
+    if conditions:
+        expression = (
+            f"{output_name} = "
+            f"if({' && '.join(conditions)}, {solar_irradiance_raster}, null())"
+        )
+    else:
+        # Copy values from the source raster into the masked output raster
+        expression = f"{output_name} = {solar_irradiance_raster}"
+
+    from grass.pygrass.modules import MultiModule  # type: ignore
+
+    # Restrict the region to the buildings for the copy, in a temporary region
+    g_region = grass_module(
+        "g.region", vector=building_vector, align=solar_irradiance_raster, run_=False
     )
-    r_mapcalc.run()
+    r_mapcalc = grass_module("r.mapcalc", expression=expression, overwrite=True, run_=False)
+
+    # The temporary region is only used when running asynchronously
+    chain = MultiModule(module_list=[g_region, r_mapcalc], sync=False, set_temp_region=True)
+    chain.run()
+    chain.wait()
 
     return output_name
 
@@ -117,12 +237,14 @@ def export_final_raster(
     output_tif: str,
     grass_module: Any,
     output_dir: Optional[Path] = None,
+    compression: str = DEFAULT_COMPRESSION,
 ) -> str:
     """Export a multi-band GeoTIFF containing raster, slope, and aspect.
 
     This function:
       - Creates an imagery group containing the three rasters using `i.group`.
-      - Calls `r.out.gdal` to export the group as a multi-band GeoTIFF.
+      - Exports the group as a compressed multi-band Cloud-Optimized GeoTIFF
+        (COG) with internal overviews, see `export_cog`.
       - Removes the temporary imagery group.
 
     Args:
@@ -135,6 +257,8 @@ def export_final_raster(
         output_dir: Optional directory in which to write the output file.
             When provided, output_tif is treated as a filename and joined with
             output_dir to form the full path.
+        compression: GeoTIFF compression ("ZSTD", "DEFLATE" or "LZW").
+            Defaults to "ZSTD".
 
     Returns:
         The full `output_tif` path for convenience.
@@ -155,17 +279,7 @@ def export_final_raster(
     else:
         output_path = output_tif
 
-    # TFW = World File containing georeferencing info
-    # LZW = Lempel-Ziv-Welch lossless compression algorithm
-    r_out_multiband = grass_module(
-        "r.out.gdal",
-        input=group_name,
-        output=output_path,
-        format="GTiff",
-        createopt="TFW=YES,COMPRESS=LZW",
-        overwrite=True,
-    )
-    r_out_multiband.run()
+    export_cog(group_name, output_path, grass_module, compression=compression)
 
     # Clean up the temporary group to avoid leaving workspace state behind.
     g_remove = grass_module(
@@ -1,16 +1,34 @@
+import contextlib
+import io
+import sys
+
 import xarray as xr
 
 
 def print_wrf_diagnostics(nc_file_path):
-    """Load a WRF NetCDF file and print comprehensive diagnostic information."""
+    """Load a WRF NetCDF file and print comprehensive diagnostic information.
+
+    The report is built in memory and written to stdout in one go, rather
+    than flushing a line at a time to a log file or notebook.
+    """
+    ds = xr.open_dataset(nc_file_path, engine="h5netcdf")
+
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        _print_diagnostics(ds, nc_file_path)
+    sys.stdout.write(buffer.getvalue())
+    sys.stdout.flush()
+
+    return ds
 
+
+def _print_diagnostics(ds, nc_file_path):
+    """Print the diagnostic report for the opened WRF dataset `ds`."""
     print("=" * 80)
     print("WRF NetCDF FILE DIAGNOSTICS")
     print("=" * 80)
     print(f"\nFile: {nc_file_path}\n")
 
-    ds = xr.open_dataset(nc_file_path, engine="h5netcdf")
-
     print("-" * 80)
     print("DATASET OVERVIEW")
     print("-" * 80)
@@ -20,7 +38,7 @@ def print_wrf_diagnostics(nc_file_path):
     print("-" * 80)
     print("DATASET INFO")
     print("-" * 80)
-    print(ds.info())
+    ds.info()
     print()
 
     print("-" * 80)
@@ -51,8 +69,12 @@ def print_wrf_diagnostics(nc_file_path):
         print(f"    Dtype: {var_data.dtype}")
         print(f"    Dimensions: {var_data.dims}")
         try:
-            print(f"    Min: {var_data.min().values}, Max: {var_data.max().values}")
-            print(f"    Mean: {var_data.mean().values}")
+            # Read the variable from disk once; each reduction on the lazy
+            # variable would otherwise re-read it
+            values = var_data.compute()
+            print(f"    Min: {values.min().values}, Max: {values.max().values}")
+            print(f"    Mean: {values.mean().values}")
+            del values
         except Exception as e:
             print(f"    (Could not compute statistics: {e})")
         if var_data.attrs:
@@ -89,5 +111,3 @@ def print_wrf_diagnostics(nc_file_path):
     print("END OF DIAGNOSTICS")
     print("=" * 80)
     print()
-
-    return ds
@@ -1,147 +1,236 @@
 """
 Digital Surface Model (DSM) utilities.
 
-This module contains helper functions for working with DSM rasters, using
-GDAL and GRASS GIS.
+This module contains helper functions for working with DSM rasters in GRASS
+GIS.
 
 High-level responsibilities:
-- Attaching virtual rasters (VRT) to GRASS as external rasters.
-- Merging tiled DSM GeoTIFFs into a single VRT (optionally can be translated
-  to a GeoTIFF).
+- Merging tiled DSM GeoTIFFs into a GRASS-native virtual mosaic with
+  `r.buildvrt`.
 - Calculating slope and aspect rasters from a DSM.
-- Filtering rasters.
 - Pre-calculating horizon rasters for solar shading optimisation.
 """
 
+import fnmatch
 import glob
-from pathlib import Path
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional, Tuple
 
-from osgeo import gdal
+from utils.misc import files_fingerprint
 
 
-def merge_rasters(dsm_file_glob: str, area_name: str, output_dir: Path) -> str:
-    """Merge tiled DSM files into a single VRT using GDAL.
+def _find_dsm_files(dsm_file_glob: str) -> list[str]:
+    """Return the DSM tiles matching `dsm_file_glob`.
 
-    This function discovers DSM tiles using a glob pattern, builds a GDAL VRT
-    (virtual raster) that mosaics them together, and returns the VRT filename.
-    The function intentionally leaves the VRT on disk instead of translating to
-    a final GeoTIFF so callers can decide on translation parameters (compression,
-    data type, nodata handling) or feed the VRT directly to GRASS via `r.external`.
-
-    Args:
-        dsm_file_glob: Glob pattern matching input DSM tiles.
-        area_name: Prefix to use for the generated VRT filename.
-
-    Returns:
-        The path to the generated VRT file.
+    When only the file name part of the pattern contains wildcards (e.g.
+    `data/area/*.tif`), the directory is listed once with `os.scandir` and
+    names are matched with `fnmatch`, avoiding glob's per-entry overhead on
+    directories with thousands of tiles. Other patterns fall back to `glob`.
 
     Raises:
         FileNotFoundError: If the glob pattern matches no files.
-        RuntimeError: If GDAL fails to create the VRT for any reason.
     """
-    # Find input files using the glob pattern
-    dsm_files = glob.glob(dsm_file_glob)
+    base_dir, pattern = os.path.split(dsm_file_glob)
+    if glob.has_magic(base_dir) or not os.path.isdir(base_dir or "."):
+        dsm_files = glob.glob(dsm_file_glob)
+    else:
+        with os.scandir(base_dir or ".") as entries:
+            dsm_files = [
+                os.path.join(base_dir, entry.name)
+                for entry in entries
+                # Like glob, skip hidden files unless the pattern asks for them
+                if fnmatch.fnmatchcase(entry.name, pattern)
+                and (pattern.startswith(".") or not entry.name.startswith("."))
+            ]
+
     if not dsm_files:
         raise FileNotFoundError(f"🚫 No files found for pattern: {dsm_file_glob}")
+    return dsm_files
 
-    # Build a Virtual Raster (VRT). Use nearest-neighbor resampling by default
-    try:
-        vrt_options = gdal.BuildVRTOptions(resampleAlg=gdal.GRA_NearestNeighbour)
-        vrt_path = f"{str(output_dir)}/{area_name}_merged.vrt"
-        gdal.BuildVRT(vrt_path, dsm_files, options=vrt_options)
-    except Exception as e:
-        # Propagate any errors
-        raise RuntimeError(f"🚫 Failed to build VRT from {len(dsm_files)} files: {e}") from e
 
-    # Return the VRT path
-    return vrt_path
+def dsm_fingerprint(dsm_file_glob: str) -> str:
+    """Return a short hash identifying the DSM tiles matching `dsm_file_glob`.
 
+    The hash covers each tile's path, size and modification time, so it
+    changes whenever a tile is added, removed or rewritten. It is used to key
+    cached results derived from the DSM.
 
-def load_virtual_raster_into_grass(input_vrt: str, output_name: str, grass_module: Any) -> str:
-    """Attach a VRT (virtual raster) to GRASS using `r.external` and set region.
+    Raises:
+        FileNotFoundError: If the glob pattern matches no files.
+    """
+    return files_fingerprint(_find_dsm_files(dsm_file_glob))
 
-    Using `r.external` avoids copying data into the GRASS database; the VRT is
-    referenced externally which is faster and uses no additional disk space.
+
+def merge_rasters_native(
+    dsm_file_glob: str,
+    output_name: str,
+    grass_module: Any,
+    set_region: bool = True,
+    materialize: bool = False,
+) -> str:
+    """Mosaic tiled DSM files inside GRASS using `r.buildvrt` and set region.
+
+    Each tile is registered with `r.external` (in parallel) and the registered
+    maps are combined into a GRASS virtual raster, so reads go straight to the
+    tile that holds the requested cells instead of through a GDAL VRT layered
+    on top of them.
+
+    Every read of an external raster decodes the compressed GeoTIFF tiles
+    again. With `materialize`, the mosaic is copied once into a native GRASS
+    raster, so the many later passes over the DSM (slope/aspect, horizon and
+    one r.sun run per key day) read it without re-decoding the tiles. The copy
+    is always FCELL (32-bit float), so Float64 tiles are downcast on ingest.
 
     Args:
-        input_vrt: Path to the VRT file on disk.
+        dsm_file_glob: Glob pattern matching input DSM tiles.
         output_name: The raster name to expose inside GRASS.
         grass_module: The GRASS Python scripting Module class.
+        set_region: Whether to align the computational region to the mosaic.
+            Pass False for secondary rasters that should not change the region
+            set by the primary DSM. Defaults to True.
+        materialize: If True, copy the mosaic into a native GRASS raster
+            (within the current region) instead of exposing the virtual
+            raster. Defaults to False.
 
     Returns:
         The GRASS raster name.
-    """
-    # Register the VRT as an external raster
-    r_external = grass_module("r.external", input=input_vrt, output=output_name, band=1, overwrite=True)
-    r_external.run()
 
-    # Print and set the region to match the attached raster
-    g_region = grass_module("g.region", raster=output_name, flags="p")
-    g_region.run()
+    Raises:
+        FileNotFoundError: If the glob pattern matches no files.
+    """
+    # Sorted so the tile names, and which tile wins where tiles overlap in the
+    # mosaic, don't depend on directory order
+    dsm_files = sorted(_find_dsm_files(dsm_file_glob))
+    vrt_name = f"{output_name}_vrt" if materialize else output_name
+
+    # Register each tile as an external raster. Each registration is its own
+    # GRASS process that only reads the tile header, so run them concurrently.
+    tile_names = [f"{output_name}_tile_{i}" for i in range(len(dsm_files))]
+    if len(dsm_files) == 1:
+        # A single tile is registered as the mosaic itself
+        tile_names = [vrt_name]
+
+    # Opening each tile would otherwise list its whole directory to look for
+    # sidecar files, which is slow for directories with thousands of tiles.
+    # With TRUE, GDAL still finds sidecars by probing their names directly.
+    register_env = {**os.environ, "GDAL_DISABLE_READDIR_ON_OPEN": "TRUE"}
+
+    def _register_tile(dsm_file: str, tile_name: str) -> None:
+        grass_module(
+            "r.external",
+            input=dsm_file,
+            output=tile_name,
+            band=1,
+            overwrite=True,
+            env_=register_env,
+        ).run()
+
+    with ThreadPoolExecutor(max_workers=min(32, len(dsm_files))) as executor:
+        # Consume the results so any registration error is raised here
+        list(executor.map(_register_tile, dsm_files, tile_names))
+
+    # Combine the registered tiles into one virtual raster
+    if len(tile_names) > 1:
+        grass_module(
+            "r.buildvrt", input=",".join(tile_names), output=vrt_name, overwrite=True
+        ).run()
+
+    # Set the region to match the mosaic
+    if set_region:
+        grass_module("g.region", raster=vrt_name).run()
+
+    if materialize:
+        # Stored as FCELL (float32): ample for elevations, and half the size of
+        # DCELL if the tiles are Float64
+        grass_module(
+            "r.mapcalc", expression=f"{output_name} = float({vrt_name})", overwrite=True
+        ).run()
 
     return output_name
 
 
-def calculate_slope_aspect_rasters(dsm: str, grass_module: Any) -> Tuple[str, str]:
+def calculate_slope_aspect_rasters(
+    dsm: str,
+    grass_module: Any,
+    nprocs: Optional[int] = None,
+    memory: int = 4096,
+    compute_edges: bool = False,
+    precision: str = "FCELL",
+    tile_size: Optional[int] = None,
+) -> Tuple[str, str]:
     """Compute slope and aspect rasters from a DSM using GRASS `r.slope.aspect`.
 
+    `r.slope.aspect` is a fixed 3x3 neighbourhood operation, so GRASS (8.3+)
+    can split it across row blocks. `nprocs` and `memory` control that
+    parallelism and the amount of raster data held in memory.
+
+    Alternatively, with `tile_size` the region is split into square tiles
+    (overlapping by 2 cells so the 3x3 stencil has its neighbours) that are
+    processed by `nprocs` separate `r.slope.aspect` processes with pygrass's
+    `GridModule`, and patched back together with `r.patch`. This can scale
+    better on very large DSMs, where each tile fits in cache.
+
     Args:
         dsm: Name of the DSM raster in the GRASS mapset.
         grass_module: The GRASS Python scripting Module class.
+        nprocs: Number of threads to use. Defaults to the number of CPUs.
+        memory: Maximum memory to use in MB. Defaults to 4096.
+        compute_edges: If True, also compute values for the cells along the
+            edges of the region (the `-e` flag). Defaults to False.
+        precision: Output raster type, "FCELL" (32-bit float) or "CELL"
+            (whole degrees). CELL halves the size of both rasters for every
+            later pass that reads them, at the cost of rounding the slope and
+            aspect given to r.sun. Defaults to "FCELL".
+        tile_size: Optional tile width/height in cells. When given, run tiles
+            in parallel with `GridModule` instead of one threaded run.
+            Defaults to None (one run over the whole region).
 
     Returns:
         A tuple `(aspect_raster_name, slope_raster_name)`.
+
+    Raises:
+        ValueError: If `precision` is not "FCELL" or "CELL".
     """
-    r_slope_aspect = grass_module(
-        "r.slope.aspect",
+    if precision not in ("FCELL", "CELL"):
+        raise ValueError(f"🚫 precision must be 'FCELL' or 'CELL', got: {precision}")
+
+    if nprocs is None:
+        nprocs = os.cpu_count() or 1
+
+    slope_aspect_kwargs = dict(
         elevation=dsm,
         slope=f"{dsm}_slope",
         aspect=f"{dsm}_aspect",
         format="degrees",
-        precision="FCELL",
+        precision=precision,
         a=True,  # compute aspect
-        nprocs=16,
+        e=compute_edges,
         overwrite=True,
     )
-    r_slope_aspect.run()
-
-    return f"{dsm}_aspect", f"{dsm}_slope"
-
-
-def filter_raster_by_slope(
-    input_raster: str,
-    slope_raster: str,
-    max_slope_degrees: float,
-    output_name: str,
-    grass_module: Any,
-) -> str:
-    """Filter `input_raster` to only keep pixels where slope <= max_slope_degrees.
 
-    This function uses a `r.mapcalc` expression to produce a masked
-    raster where any pixel with slope greater than `max_slope_degrees` is set
-    to NULL (GRASS NULL) and valid pixels retain their original value.
-
-    Example expression used:
-        output = if(slope_raster <= max_slope_degrees, input_raster, null())
-
-    Args:
-        input_raster: GRASS raster name containing the values to be filtered.
-        slope_raster: GRASS raster name containing slope in degrees.
-        max_slope_degrees: Maximum allowed slope (inclusive). Pixels with slope
-            greater than this value will be masked to NULL.
-        output_name: Name for the output raster.
-        grass_module: The GRASS Python scripting Module class.
-
-    Returns:
-        The name of the output raster.
-    """
-    # Build and run the r.mapcalc expression to mask out steep slopes
-    expression = f"{output_name} = if({slope_raster} <= {max_slope_degrees}, {input_raster}, null())"
-    r_mapcalc = grass_module("r.mapcalc", expression=expression, overwrite=True)
-    r_mapcalc.run()
+    if tile_size is not None:
+        from grass.pygrass.modules.grid import GridModule  # type: ignore
+
+        # One single-threaded process per tile, nprocs tiles at a time
+        grid = GridModule(
+            "r.slope.aspect",
+            width=tile_size,
+            height=tile_size,
+            overlap=2,
+            processes=nprocs,
+            patch_backend="r.patch",
+            memory=max(1, memory // nprocs),
+            **slope_aspect_kwargs,
+        )
+        grid.run()
+    else:
+        r_slope_aspect = grass_module(
+            "r.slope.aspect", nprocs=nprocs, memory=memory, **slope_aspect_kwargs
+        )
+        r_slope_aspect.run()
 
-    return output_name
+    return f"{dsm}_aspect", f"{dsm}_slope"
 
 
 def calculate_horizon_raster(
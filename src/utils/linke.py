@@ -21,8 +21,51 @@
 
 import sys
 
+import numpy
+
+##### put monthly data here
+# e.g. northern hemisphere mountains:  (from the r.sun help page)
+#    [jan,feb,mar,...,dec]
+# numbers taken from Worldwide Linke turbidity information: https://hal.science/hal-00465791
+# Using Mount Gambier, Tasmania values as it's at -37.73 latitude
+_LINKE_DATA = numpy.array([2.9, 3.0, 2.8, 2.7, 3.0, 2.8, 2.5, 2.9, 3.3, 2.9, 3.1, 3.1])
+
+_MONTH_DAYS = numpy.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+# Day of year at the middle (15th) of each month
+_MIDMONTH_DAY = 15 + numpy.cumsum(_MONTH_DAYS[:-1])
+
+# Pad with the last/first three months of the neighbouring years so the spline
+# wraps smoothly across the new year
+_LINKE_WRAP = numpy.concatenate((_LINKE_DATA[9:12], _LINKE_DATA, _LINKE_DATA[0:3]))
+_MIDMONTH_WRAP = numpy.concatenate(
+    (_MIDMONTH_DAY[9:12] - 365, _MIDMONTH_DAY, _MIDMONTH_DAY[0:3] + 365)
+)
+
+# Interpolated Linke turbidity for days 1..365 (index with day - 1), built on
+# first use by `_linke_table`
+_LINKE_TABLE = None
+
+
+def _linke_table():
+    """Return the Linke turbidity table, building it on the first call.
+
+    SciPy is only imported here, so importing this module stays cheap.
+    """
+    global _LINKE_TABLE
+    if _LINKE_TABLE is None:
+        from scipy.interpolate import CubicSpline
+
+        # Same not-a-knot cubic spline that interp1d(kind="cubic") builds internally
+        interp = CubicSpline(_MIDMONTH_WRAP, _LINKE_WRAP)
+        _LINKE_TABLE = interp(numpy.arange(1, 365 + 1))
+    return _LINKE_TABLE
+
 
 def _validate_day_arg(day_val):
+    # Fast path for plain ints, e.g. from the key-day loop
+    if type(day_val) is int and 1 <= day_val <= 365:
+        return day_val
+
     try:
         d = int(day_val)
     except (ValueError, TypeError):
@@ -34,36 +77,32 @@ def _validate_day_arg(day_val):
     return d
 
 
-def linke_by_day(day):
-    import numpy
-    from scipy import interpolate
+def _validate_days_array(days):
+    try:
+        d = numpy.asarray(days).astype(int)
+    except (ValueError, TypeError):
+        raise ValueError("🚫 days must be integers")
 
-    d = _validate_day_arg(day)
+    if numpy.any((d < 1) | (d > 365)):
+        raise ValueError("🚫 days must be within 1..365")
+
+    return d
 
-    ##### put monthly data here
-    # e.g. northern hemisphere mountains:  (from the r.sun help page)
-    #    [jan,feb,mar,...,dec]
-    # numbers taken from Worldwide Linke turbidity information: https://hal.science/hal-00465791
-    # Using Mount Gambier, Tasmania values as it's at -37.73 latitude
-    linke_data = numpy.array(
-        [2.9, 3.0, 2.8, 2.7, 3.0, 2.8, 2.5, 2.9, 3.3, 2.9, 3.1, 3.1]
-    )
 
-    linke_data_wrap = numpy.concatenate((linke_data[9:12], linke_data, linke_data[0:3]))
+def linke_by_day(day):
+    """Interpolate the Linke turbidity value for a day of year.
 
-    monthDays = numpy.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
-    # init empty
-    midmonth_day = numpy.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
-    for i in range(1, 12 + 1):
-        midmonth_day[i - 1] = 15 + sum(monthDays[0:i])
+    `day` may be a single day (returns a float) or an array-like of days
+    (returns a numpy array). Values come from a table computed once, on the
+    first call, so each call is an array lookup.
+    """
+    if numpy.ndim(day) > 0:
+        return _linke_table()[_validate_days_array(day) - 1]
 
-    midmonth_day_wrap = numpy.concatenate(
-        (midmonth_day[9:12] - 365, midmonth_day, midmonth_day[0:3] + 365)
-    )
+    d = _validate_day_arg(day)
 
-    linke = interpolate.interp1d(midmonth_day_wrap, linke_data_wrap, kind="cubic")
     # return interpolated value
-    return float(linke(d))
+    return float(_linke_table()[d - 1])
 
 
 # CLI usage
@@ -1,12 +1,14 @@
+import hashlib
 import os
 import pathlib
+from typing import Iterable
 
 
 def generate_duration_message(total_seconds: float) -> str:
     days, remainder = divmod(total_seconds, 86400)
     hours, remainder = divmod(remainder, 3600)
     minutes, seconds = divmod(remainder, 60)
-    return f"The pipeline took {round(total_seconds)} seconds ({round(days)} days, {round(hours)} hours, {round(minutes)} minutes, and {round(seconds)} seconds)"
+    return f"The pipeline took {round(total_seconds)} seconds ({int(days)} days, {int(hours)} hours, {int(minutes)} minutes, and {round(seconds)} seconds)"
 
 
 def calculate_tif_size_MB(glob_pattern):
@@ -37,3 +39,17 @@ def get_dir_size_MB(directory):
 
     total_mb = total_size / (1024 * 1024)
     return total_mb
+
+
+def files_fingerprint(paths: Iterable[str]) -> str:
+    """Return a short hash identifying the files at `paths`.
+
+    The hash covers each file's absolute path, size and modification time, so
+    it changes whenever a file is added, removed or rewritten. The order of
+    `paths` doesn't matter.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(os.path.abspath(p) for p in paths):
+        stat = os.stat(path)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
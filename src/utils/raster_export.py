@@ -0,0 +1,212 @@
+"""
+Raster export helpers.
+
+Utilities for writing GRASS rasters out as GeoTIFFs with `r.out.gdal` using
+consistent creation options, and for post-processing the written files, such
+as adding internal overviews so downstream viewers and QA tools can read the
+rasters at lower zoom levels without re-scanning the full-resolution data, or
+converting them to Cloud-Optimized GeoTIFFs (COG).
+"""
+
+import os
+from typing import Any, Sequence
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_OVERVIEW_LEVELS = (2, 4, 8, 16)
+
+# GeoTIFF compression codecs and the creation option setting their level
+GEOTIFF_COMPRESSIONS = {
+    "ZSTD": "ZSTD_LEVEL=3",
+    "DEFLATE": "ZLEVEL=6",
+    "LZW": None,
+}
+DEFAULT_COMPRESSION = "ZSTD"
+
+
+def geotiff_createopt(compression: str = DEFAULT_COMPRESSION) -> str:
+    """Build the `r.out.gdal` `createopt` string for a float GeoTIFF export.
+
+    Outputs are tiled (512x512) with the floating point predictor, which suits
+    the irradiance, slope, aspect and horizon rasters the pipeline exports.
+    No world file is written; the georeferencing is stored in the GeoTIFF.
+
+    Args:
+        compression: One of "ZSTD", "DEFLATE" or "LZW". Defaults to "ZSTD".
+
+    Returns:
+        A comma-separated GDAL creation option string.
+
+    Raises:
+        ValueError: If `compression` is not supported.
+    """
+    compression = compression.upper()
+    if compression not in GEOTIFF_COMPRESSIONS:
+        raise ValueError(
+            f"🚫 Unsupported compression '{compression}', expected one of: "
+            f"{', '.join(GEOTIFF_COMPRESSIONS)}"
+        )
+
+    options = [
+        "TILED=YES",
+        "BLOCKXSIZE=512",
+        "BLOCKYSIZE=512",
+        f"COMPRESS={compression}",
+        "PREDICTOR=3",
+        "NUM_THREADS=ALL_CPUS",
+        "BIGTIFF=IF_SAFER",
+    ]
+    level = GEOTIFF_COMPRESSIONS[compression]
+    if level:
+        options.append(level)
+
+    return ",".join(options)
+
+
+def export_geotiff(
+    raster_name: str,
+    output_path: str,
+    grass_module: Any,
+    compression: str = DEFAULT_COMPRESSION,
+    overviews: bool = False,
+) -> str:
+    """Export a GRASS raster (or imagery group) to a GeoTIFF with `r.out.gdal`.
+
+    Bands are written as Float32, which is ample precision for irradiance,
+    slope, aspect and horizon angles and half the size of Float64.
+
+    Args:
+        raster_name: Name of the raster, or imagery group for a multi-band
+            file, to export.
+        output_path: Path of the GeoTIFF to write.
+        grass_module: The GRASS Python scripting Module class.
+        compression: GeoTIFF compression, see `geotiff_createopt`.
+        overviews: If True, build internal overviews after writing, see
+            `build_overviews`. Defaults to False.
+
+    Returns:
+        The `output_path` for convenience.
+    """
+    r_out = grass_module(
+        "r.out.gdal",
+        input=raster_name,
+        output=output_path,
+        format="GTiff",
+        type="Float32",
+        createopt=geotiff_createopt(compression),
+        overwrite=True,
+        quiet=True,
+    )
+    r_out.run()
+
+    if overviews:
+        build_overviews(output_path, compression=compression)
+
+    return output_path
+
+
+def build_overviews(
+    tif_path: str,
+    levels: Sequence[int] = DEFAULT_OVERVIEW_LEVELS,
+    resampling: str = "AVERAGE",
+    compression: str = "DEFLATE",
+) -> str:
+    """Build internal overviews (pyramids) for an exported GeoTIFF.
+
+    Overviews are written into the GeoTIFF itself, so no `.ovr` sidecar file
+    is created.
+
+    Args:
+        tif_path: Path to the GeoTIFF to update in place.
+        levels: Overview decimation factors. Defaults to (2, 4, 8, 16).
+        resampling: GDAL resampling method for the overviews. Defaults to
+            "AVERAGE", which suits continuous rasters such as irradiance.
+        compression: Compression for the overview levels. Defaults to "DEFLATE".
+
+    Returns:
+        The `tif_path` for convenience.
+
+    Raises:
+        RuntimeError: If GDAL cannot open the file or build the overviews.
+    """
+    from osgeo import gdal
+
+    gdal.UseExceptions()
+
+    try:
+        overview_options = {"COMPRESS_OVERVIEW": compression, "PREDICTOR_OVERVIEW": "3"}
+        with gdal.config_options(overview_options):
+            dataset = gdal.Open(tif_path, gdal.GA_Update)
+            dataset.BuildOverviews(resampling, list(levels))
+            # Flush the overviews to disk
+            dataset = None
+    except RuntimeError as e:
+        raise RuntimeError(f"🚫 Failed to build overviews for {tif_path}: {e}") from e
+
+    logger.debug("Built overviews %s for %s", list(levels), tif_path)
+
+    return tif_path
+
+
+def export_cog(
+    raster_name: str,
+    output_path: str,
+    grass_module: Any,
+    compression: str = DEFAULT_COMPRESSION,
+) -> str:
+    """Export a GRASS raster (or imagery group) as a Cloud-Optimized GeoTIFF.
+
+    The raster is first written as a tiled GeoTIFF with internal overviews
+    (see `export_geotiff`), which GDAL's COG driver then copies, overviews
+    included, into the COG layout. Writing through a temporary GeoTIFF keeps
+    memory use bounded: `r.out.gdal` would otherwise build the whole raster
+    in memory, since the COG driver can only copy an existing dataset.
+
+    Args:
+        raster_name: Name of the raster, or imagery group for a multi-band
+            file, to export.
+        output_path: Path of the COG to write.
+        grass_module: The GRASS Python scripting Module class.
+        compression: Compression, one of "ZSTD", "DEFLATE" or "LZW".
+
+    Returns:
+        The `output_path` for convenience.
+
+    Raises:
+        RuntimeError: If GDAL fails to write the COG.
+    """
+    from osgeo import gdal
+
+    gdal.UseExceptions()
+
+    compression = compression.upper()
+    level = GEOTIFF_COMPRESSIONS.get(compression)
+    creation_options = [
+        f"COMPRESS={compression}",
+        "PREDICTOR=FLOATING_POINT",
+        "BLOCKSIZE=512",
+        "NUM_THREADS=ALL_CPUS",
+        "BIGTIFF=IF_SAFER",
+        "OVERVIEWS=FORCE_USE_EXISTING",
+    ]
+    if level:
+        # e.g. "ZSTD_LEVEL=3" -> "LEVEL=3"
+        creation_options.append(f"LEVEL={level.split('=')[1]}")
+
+    root, _ = os.path.splitext(output_path)
+    staging_path = f"{root}.staging.tif"
+    export_geotiff(
+        raster_name, staging_path, grass_module, compression=compression, overviews=True
+    )
+
+    try:
+        gdal.Translate(output_path, staging_path, format="COG", creationOptions=creation_options)
+    except RuntimeError as e:
+        raise RuntimeError(f"🚫 Failed to write COG {output_path}: {e}") from e
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+    return output_path
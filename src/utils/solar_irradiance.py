@@ -11,77 +11,102 @@ The main workflow (if WRF data is provided) involves:
     3. Normalize to create coefficient rasters to adjust WRF data
 """
 
+import hashlib
+import math
+import os
 from pathlib import Path
-from subprocess import PIPE
 from typing import Optional
 
+from .grass_utils import remove_rasters, run_mapcalc_expressions, temp_region
 from .linke import linke_by_day
+from .raster_export import DEFAULT_COMPRESSION, export_geotiff
+from utils.logging_config import get_logger
 
+logger = get_logger(__name__)
 
-def _get_raster_min_max(raster_name: str, grass_module) -> tuple[float, float]:
-    """Get minimum and maximum values from a GRASS raster using r.univar.
+# r.sun's OpenMP scaling flattens out around 16 threads per run; use fewer on
+# smaller hosts rather than oversubscribing them
+DEFAULT_NPROCS = min(16, max(1, os.cpu_count() or 1))
 
-    This is a helper function that extracts basic statistics from a raster
-    using the GRASS r.univar module.
+# Cap on the default r.sun tile overlap, as a fraction of the tile size. Every
+# tile computes (1 + 2 * fraction)^2 times its own area, so an uncapped shadow
+# overlap on steep terrain would make tiling slower than a single run.
+MAX_TILE_OVERLAP_FRACTION = 0.25
+
+
+def auto_parallel_days(n_key_days: int, total_threads: int) -> int:
+    """Return how many key days to run r.sun for at once on `total_threads`.
+
+    Each concurrent run gets up to `DEFAULT_NPROCS` threads, where r.sun's
+    scaling flattens out, so hosts with more cores than that run several key
+    days side by side instead of oversubscribing a single run.
+    """
+    return max(1, min(n_key_days, total_threads // DEFAULT_NPROCS))
+
+
+def _get_raster_min_max(raster_name: str) -> tuple[float, float]:
+    """Get minimum and maximum values from a GRASS raster using r.info.
+
+    GRASS records the range of every raster when it is written, so `r.info -r`
+    reads it from the raster's metadata instead of scanning the cells like
+    `r.univar` does. `r.univar` is only used for rasters without a stored
+    range (reported as NULL).
 
     Args:
         raster_name: Name of the raster in the current GRASS mapset.
-        grass_module: The GRASS Python scripting Module class.
 
     Returns:
         A tuple of (min_value, max_value) as floats.
     """
-    univar = grass_module(
-        "r.univar",
-        map=raster_name,
-        flags="g",
-        stdout_=PIPE,
-    )
-    univar.run()
+    import grass.script as gscript  # type: ignore
 
-    # Parse the key=value output from r.univar -g
-    stats = {}
-    for line in univar.outputs.stdout.strip().split("\n"):
-        if "=" in line:
-            key, value = line.split("=", 1)
-            stats[key] = value
+    stats = gscript.parse_command("r.info", flags="r", map=raster_name)
+    if "NULL" in (stats.get("min"), stats.get("max")):
+        stats = gscript.parse_command("r.univar", flags="g", map=raster_name)
 
     return float(stats["min"]), float(stats["max"])
 
 
-def _percent_of_max_raster(
-    input_raster: str,
-    output_raster: str,
+def _percent_of_max_rasters(
+    rasters: dict[str, str],
     grass_module,
-) -> str:
-    """Normalize a raster to percentage of the maximum value (0-1 scale).
+) -> dict[str, str]:
+    """Normalize rasters to percentage of their maximum value (0-1 scale).
 
     Applies the formula: percent = value / max
 
-    This creates a coefficient raster where:
+    This creates coefficient rasters where:
         - 1 represents the maximum irradiance location
         - Other values are a fraction of the maximum
 
+    Each maximum comes from the raster's stored range, and all the
+    normalizations are evaluated together in batched `r.mapcalc` runs.
+
     Args:
-        input_raster: Name of the input raster to normalize.
-        output_raster: Name for the normalized output raster.
+        rasters: Mapping of input raster name to normalized output raster name.
         grass_module: The GRASS Python scripting Module class.
 
     Returns:
-        The name of the output normalized raster (same as output_raster).
+        The `rasters` mapping for convenience.
     """
-    _, max_val = _get_raster_min_max(input_raster, grass_module)
+    expressions = []
+    for input_raster, output_raster in rasters.items():
+        _, max_val = _get_raster_min_max(input_raster)
+        expressions.append(f"{output_raster} = float({input_raster}) / float({max_val})")
 
-    # Build the r.mapcalc expression for percent-of-max normalization
-    mapcalc_expr = f"{output_raster} = float({input_raster}) / float({max_val})"
+    run_mapcalc_expressions(expressions, grass_module)
+
+    return rasters
 
-    grass_module(
-        "r.mapcalc",
-        expression=mapcalc_expr,
-        overwrite=True,
-    ).run()
 
-    return output_raster
+def day_raster_pattern(dsm: str) -> str:
+    """Return a GRASS wildcard pattern matching the per-day irradiance rasters.
+
+    Matches both the r.sun key day rasters (`<dsm>_solar_irradiance_day<N>`)
+    and the interpolated ones (`<dsm>_solar_irradiance_interp_day<N>`), but not
+    the summed `<dsm>_solar_irradiance_interp` raster.
+    """
+    return f"{dsm}_solar_irradiance_*day*"
 
 
 def calculate_solar_irradiance(
@@ -94,6 +119,12 @@ def calculate_solar_irradiance(
     grass_module,
     horizon: Optional[str] = None,
     horizon_step_degrees: Optional[float] = None,
+    nprocs: Optional[int] = None,
+    queue=None,
+    tile_size: Optional[int] = None,
+    tile_overlap: Optional[int] = None,
+    linke_value: Optional[float] = None,
+    tile_mask: Optional[str] = None,
 ) -> str:
     """Calculate solar irradiance for a single day using the GRASS r.sun module.
 
@@ -119,6 +150,24 @@ def calculate_solar_irradiance(
         horizon_step_degrees: Azimuth step in *degrees* matching the horizon raster
             set produced by r.horizon. This MUST NOT be the same as the r.sun time
             integration step (hours). Required when horizon is provided.
+        nprocs: Number of threads r.sun uses. Defaults to `DEFAULT_NPROCS`
+            (the number of CPUs, capped at 16).
+        queue: Optional `ParallelModuleQueue`. When provided, the r.sun module
+            is added to the queue instead of being run, and the output raster
+            only exists once the queue has been waited on.
+        tile_size: Optional tile width/height in cells. When given, the region
+            is split into tiles that are run as `nprocs` single-threaded r.sun
+            processes with pygrass's `GridModule`, and patched together with
+            `r.patch`. Can't be combined with `queue`.
+        tile_overlap: Overlap between tiles in cells, so shadows cast across
+            tile edges are kept. Defaults to `r_sun_tile_overlap(dsm,
+            tile_size, horizon)`.
+        linke_value: Linke turbidity for the day. Defaults to
+            `linke_by_day(day)`.
+        tile_mask: Optional raster to mask each tile with. The tiles run in
+            their own temporary mapsets, which don't see the active `r.mask`,
+            so pass the mask raster here to restrict tiled runs to it. Only
+            used with `tile_size`.
 
     Returns:
         The name of the output global radiation raster (same as grass_output).
@@ -127,42 +176,158 @@ def calculate_solar_irradiance(
         This function assumes the GRASS computational region is already set
         appropriately for the DSM. The output units are Wh/m²/day.
     """
+    if nprocs is None:
+        nprocs = DEFAULT_NPROCS
+    if linke_value is None:
+        linke_value = linke_by_day(day)
+
+    r_sun_kwargs = dict(
+        elevation=dsm,
+        aspect=aspect,
+        slope=slope,
+        day=day,
+        step=step,
+        linke_value=linke_value,
+        nprocs=nprocs,
+        glob_rad=grass_output,
+        overwrite=True,
+    )
+
     if horizon is not None:
         if horizon_step_degrees is None:
             raise ValueError(
                 "horizon_step_degrees must be provided when horizon is not None"
             )
 
-        grass_module(
+        r_sun_kwargs.update(horizon_basename=horizon, horizon_step=horizon_step_degrees)
+
+    if tile_size is not None:
+        if queue is not None:
+            raise ValueError("🚫 tile_size can't be used together with queue")
+
+        from grass.pygrass.modules.grid import GridModule  # type: ignore
+
+        if tile_overlap is None:
+            tile_overlap = r_sun_tile_overlap(dsm, tile_size, horizon)
+
+        # One single-threaded r.sun per tile, nprocs tiles at a time
+        r_sun_kwargs["nprocs"] = 1
+        grid = GridModule(
             "r.sun",
-            elevation=dsm,
-            aspect=aspect,
-            slope=slope,
-            day=day,
-            step=step,
-            linke_value=linke_by_day(day),
-            nprocs=16,
-            glob_rad=grass_output,
-            horizon_basename=horizon,
-            horizon_step=horizon_step_degrees,
-            overwrite=True,
-        ).run()
+            width=tile_size,
+            height=tile_size,
+            overlap=tile_overlap,
+            processes=nprocs,
+            mask=tile_mask,
+            patch_backend="r.patch",
+            **r_sun_kwargs,
+        )
+        grid.run()
+        return grass_output
+
+    r_sun = grass_module("r.sun", run_=False, **r_sun_kwargs)
+
+    if queue is not None:
+        queue.put(r_sun)
     else:
-        grass_module(
-            "r.sun",
-            elevation=dsm,
-            aspect=aspect,
-            slope=slope,
-            day=day,
-            step=step,
-            linke_value=linke_by_day(day),
-            nprocs=16,
-            glob_rad=grass_output,
-            overwrite=True,
-        ).run()
+        r_sun.run()
+
     return grass_output
 
 
+def shadow_overlap_cells(dsm: str, min_sun_altitude_degrees: float = 5.0) -> int:
+    """Estimate how far (in cells) shadows can reach across the DSM.
+
+    A point at the DSM's maximum elevation can shade cells up to
+    `(max - min) / tan(altitude)` away when the sun is at `altitude`. Shadows
+    from a sun lower than `min_sun_altitude_degrees` are ignored; they are
+    long but carry little energy.
+
+    Args:
+        dsm: Name of the DSM raster in GRASS.
+        min_sun_altitude_degrees: Lowest sun altitude to keep shadows for.
+
+    Returns:
+        The overlap in cells (at least 1) at the current region resolution.
+    """
+    import grass.script as gscript  # type: ignore
+
+    min_elevation, max_elevation = _get_raster_min_max(dsm)
+    region = gscript.parse_command("g.region", flags="g")
+    resolution = min(float(region["nsres"]), float(region["ewres"]))
+
+    shadow_length = (max_elevation - min_elevation) / math.tan(
+        math.radians(min_sun_altitude_degrees)
+    )
+    return max(1, math.ceil(shadow_length / resolution))
+
+
+def r_sun_tile_overlap(dsm: str, tile_size: int, horizon: Optional[str] = None) -> int:
+    """Return the default overlap (in cells) between tiled r.sun runs.
+
+    With `horizon`, r.sun takes its shading from the horizon rasters, which
+    were calculated over the whole DSM, so it reads nothing from neighbouring
+    cells and tiles don't need to overlap. Otherwise the overlap is
+    `shadow_overlap_cells(dsm)`, capped at `MAX_TILE_OVERLAP_FRACTION` of the
+    tile size. Shadows longer than the cap that cross a tile edge are missed,
+    which slightly overestimates irradiance near tile edges in steep terrain;
+    pass an explicit overlap (or use horizon rasters) to avoid that.
+
+    Args:
+        dsm: Name of the DSM raster in GRASS.
+        tile_size: Tile width/height in cells.
+        horizon: Optional base name of the horizon rasters r.sun uses.
+
+    Returns:
+        The overlap in cells.
+    """
+    if horizon is not None:
+        return 0
+
+    max_overlap = max(1, int(tile_size * MAX_TILE_OVERLAP_FRACTION))
+    return min(shadow_overlap_cells(dsm), max_overlap)
+
+
+def _r_sun_cache_path(
+    cache_dir: Path,
+    cache_key: str,
+    dsm: str,
+    day: int,
+    step: float,
+    horizon: Optional[str] = None,
+    horizon_step_degrees: Optional[float] = None,
+) -> Path:
+    """Return the cached GeoTIFF path for one r.sun run.
+
+    The file name hashes every input that changes the r.sun output: the
+    caller's `cache_key` (identifying the DSM and the rasters derived from
+    it), the DSM raster name, day, time step, Linke turbidity and horizon.
+    """
+    parts = [cache_key, dsm, day, step, linke_by_day(day), horizon, horizon_step_degrees]
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"r_sun_{digest}.tif"
+
+
+def _import_cached_day(cache_path: Path, grass_output: str, grass_module) -> str:
+    """Import a cached r.sun GeoTIFF into GRASS as `grass_output`."""
+    grass_module(
+        "r.in.gdal", input=str(cache_path), output=grass_output, overwrite=True, quiet=True
+    ).run()
+    return grass_output
+
+
+def _store_cached_day(grass_output: str, cache_path: Path, grass_module) -> None:
+    """Export an r.sun output raster to the cache.
+
+    The GeoTIFF is written under a temporary name and moved into place, so an
+    interrupted export never leaves a partial file that looks like a cache hit.
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = cache_path.with_suffix(".partial.tif")
+    export_geotiff(grass_output, str(partial_path), grass_module)
+    os.replace(partial_path, cache_path)
+
+
 def calculate_solar_irradiance_interpolated(
     dsm: str,
     aspect,
@@ -174,6 +339,16 @@ def calculate_solar_irradiance_interpolated(
     output_dir: Optional[Path] = None,
     horizon: Optional[str] = None,
     horizon_step_degrees: Optional[float] = None,
+    keep_day_rasters: bool = True,
+    sum_engine: str = "mapcalc",
+    parallel_days: Optional[int] = 1,
+    nprocs: Optional[int] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    cache_dir: Optional[Path] = None,
+    cache_key: str = "",
+    tile_size: Optional[int] = None,
+    tile_overlap: Optional[int] = None,
+    tile_mask: Optional[str] = None,
 ) -> tuple[dict[int, str], str]:
     """Calculate interpolated solar irradiance between key sample days.
 
@@ -184,7 +359,9 @@ def calculate_solar_irradiance_interpolated(
     Workflow:
         1. Run r.sun for each key day to get irradiance values
         2. Interpolate between key days to fill in the intermediate days
-        3. Sum all daily rasters to get total irradiance over the period
+           (only written when `keep_day_rasters` is True)
+        3. Sum all days to get total irradiance over the period, as a
+           weighted sum of the key day rasters
 
     Args:
         dsm: Name of the Digital Surface Model raster in GRASS.
@@ -205,6 +382,46 @@ def calculate_solar_irradiance_interpolated(
             (10–30 % faster).  Defaults to None.
         horizon_step_degrees: Azimuth step in degrees matching the horizon raster
             set produced by r.horizon. Required when horizon is provided.
+        keep_day_rasters: If True (default), also write and return a raster
+            for every interpolated day. If False, no interpolated day rasters
+            are written. Either way the total is a single weighted sum of the
+            key day rasters. Use False when the per-day rasters aren't needed
+            afterwards. With False, `parallel_days` of 1 and the "mapcalc"
+            engine, each key day is added to the sum as soon as its r.sun run
+            finishes and then removed, so only one key day raster is kept on
+            disk at a time.
+        sum_engine: How the weighted sum is computed: "mapcalc" (default)
+            with `r.mapcalc`, or "numpy" by reading the key day rasters into
+            float32 NumPy arrays.
+        parallel_days: Number of key days to run r.sun for concurrently, using
+            GRASS's `ParallelModuleQueue`. The `nprocs` threads are split
+            between them, since r.sun scales sublinearly with threads and
+            independent days make better use of many cores. None sizes it
+            from the CPU count, see `auto_parallel_days`. Defaults to 1 (one
+            day at a time).
+        nprocs: Total number of r.sun threads to use. Defaults to
+            `DEFAULT_NPROCS` (the number of CPUs, capped at 16) when key days
+            run one at a time, or to the number of CPUs when `parallel_days`
+            is None or greater than 1.
+        compression: GeoTIFF compression used when exporting ("ZSTD",
+            "DEFLATE" or "LZW"). Defaults to "ZSTD".
+        cache_dir: Optional directory for caching each key day's r.sun output
+            as a GeoTIFF. Key days with a cached result are imported instead
+            of running r.sun again, and new results are added to the cache.
+            Defaults to None (no caching).
+        cache_key: String identifying the inputs behind `dsm`, `aspect`,
+            `slope` and `horizon` (for example a hash of the DSM tiles), so
+            results for different inputs under the same raster names are
+            never mixed up. Only used with `cache_dir`.
+        tile_size: Optional tile width/height in cells to split each r.sun
+            run into (see `calculate_solar_irradiance`). Key days then run one
+            at a time, each using all `nprocs` for its tiles, and
+            `parallel_days` is ignored (with a warning if greater than 1).
+        tile_overlap: Overlap between tiles in cells. Defaults to
+            `r_sun_tile_overlap(dsm, tile_size, horizon)`.
+        tile_mask: Optional raster to mask each tile with, see
+            `calculate_solar_irradiance`. Pass the raster behind the active
+            `r.mask` so tiled runs are masked like untiled ones.
 
     Returns:
         A tuple containing:
@@ -213,26 +430,169 @@ def calculate_solar_irradiance_interpolated(
               min(key_days) to max(key_days). This includes both the exact
               r.sun calculations for key_days and interpolated values for
               days in between. The caller is responsible for cleaning up
-              these rasters when no longer needed.
+              these rasters when no longer needed; they all match the
+              pattern `day_raster_pattern(dsm)`. Empty when
+              `keep_day_rasters` is False.
             - summed_irradiance: Name of the raster containing the sum of
               all daily irradiance values (total Wh/m² over the period).
     """
-    # Step 1: Calculate irradiance for each key day
-    key_day_rasters = []
-    for day in key_days:
-        day_map = calculate_solar_irradiance(
-            dsm=dsm,
-            grass_output=f"{dsm}_solar_irradiance_day{day}",
-            aspect=aspect,
-            slope=slope,
-            day=day,
-            step=step,
-            grass_module=grass_module,
-            horizon=horizon,
-            horizon_step_degrees=horizon_step_degrees,
-        )
-        key_day_rasters.append(day_map)
+    # Keep every step on the DSM's grid, whatever region the caller has set
+    with temp_region(grass_module, raster=dsm):
+        # Step 1: Calculate irradiance for each key day
+        if tile_size is not None:
+            # Each day is already split across processes
+            if nprocs is None:
+                nprocs = os.cpu_count() or 1
+            if parallel_days is not None and parallel_days > 1:
+                logger.warning(
+                    "Ignoring parallel_days=%s: tiled r.sun runs one key day at a time",
+                    parallel_days,
+                )
+            parallel_days = 1
+        elif parallel_days is None:
+            if nprocs is None:
+                nprocs = os.cpu_count() or 1
+            parallel_days = auto_parallel_days(len(key_days), nprocs)
+        elif parallel_days > 1 and nprocs is None:
+            # Split every CPU between the concurrent days
+            nprocs = os.cpu_count() or 1
+        if nprocs is None:
+            nprocs = DEFAULT_NPROCS
+        parallel_days = max(1, min(parallel_days, len(key_days)))
+
+        if tile_size is not None and tile_overlap is None:
+            tile_overlap = r_sun_tile_overlap(dsm, tile_size, horizon)
+        queue = None
+        if parallel_days > 1:
+            from grass.pygrass.modules import ParallelModuleQueue  # type: ignore
+
+            queue = ParallelModuleQueue(nprocs=parallel_days)
+
+        summed_irradiance = f"{dsm}_solar_irradiance_interp"
+
+        # When running one day at a time without keeping day rasters, fold each
+        # key day into the running sum as soon as it's done and drop it, so at
+        # most one key day raster is on disk at a time.
+        stream_sum = not keep_day_rasters and queue is None and sum_engine == "mapcalc"
+        pending_weights = _key_day_weights(key_days) if stream_sum else {}
+        sum_started = False
+
+        # Linke turbidity for every key day in one table lookup
+        linke_values = dict(zip(key_days, linke_by_day(key_days).tolist()))
+
+        key_day_rasters = []
+        # Key day rasters (and their cache paths) computed by r.sun in this run
+        uncached_rasters = {}
+        for day in key_days:
+            grass_output = f"{dsm}_solar_irradiance_day{day}"
+            if cache_dir is not None:
+                cache_path = _r_sun_cache_path(
+                    cache_dir, cache_key, dsm, day, step, horizon, horizon_step_degrees
+                )
+                if cache_path.exists():
+                    logger.info("Using cached r.sun result for day %s: %s", day, cache_path)
+                    day_map = _import_cached_day(cache_path, grass_output, grass_module)
+                    if stream_sum:
+                        sum_started = _fold_into_sum(
+                            summed_irradiance,
+                            day_map,
+                            pending_weights.pop(day, None),
+                            sum_started,
+                            grass_module,
+                        )
+                    else:
+                        key_day_rasters.append(day_map)
+                    continue
+                uncached_rasters[grass_output] = cache_path
+
+            day_map = calculate_solar_irradiance(
+                dsm=dsm,
+                grass_output=grass_output,
+                aspect=aspect,
+                slope=slope,
+                day=day,
+                step=step,
+                grass_module=grass_module,
+                horizon=horizon,
+                horizon_step_degrees=horizon_step_degrees,
+                nprocs=max(1, nprocs // parallel_days),
+                queue=queue,
+                tile_size=tile_size,
+                tile_overlap=tile_overlap,
+                linke_value=linke_values[day],
+                tile_mask=tile_mask,
+            )
+            if stream_sum:
+                if grass_output in uncached_rasters:
+                    _store_cached_day(grass_output, uncached_rasters.pop(grass_output), grass_module)
+                sum_started = _fold_into_sum(
+                    summed_irradiance,
+                    day_map,
+                    pending_weights.pop(day, None),
+                    sum_started,
+                    grass_module,
+                )
+            else:
+                key_day_rasters.append(day_map)
+
+        if queue is not None:
+            # Block until every queued r.sun run has finished
+            failed = [m.name for m in queue.wait() if getattr(m, "returncode", 0)]
+            if failed:
+                raise RuntimeError(f"🚫 {len(failed)} r.sun run(s) failed for key days: {key_days}")
+
+        for grass_output, cache_path in uncached_rasters.items():
+            _store_cached_day(grass_output, cache_path, grass_module)
+
+        if stream_sum:
+            day_irradiance_rasters = {}
+        elif keep_day_rasters:
+            day_irradiance_rasters = _interpolate_and_sum(
+                key_days,
+                key_day_rasters,
+                dsm,
+                summed_irradiance,
+                grass_module,
+                sum_engine=sum_engine,
+            )
+        else:
+            _weighted_key_day_sum(
+                key_days, key_day_rasters, summed_irradiance, grass_module, engine=sum_engine
+            )
+            day_irradiance_rasters = {}
+
+        # Optionally export the summed raster as a GeoTIFF
+        if export:
+            output_filename = f"{summed_irradiance}.tif"
+            if output_dir is not None:
+                output_path = str(Path(output_dir) / output_filename)
+            else:
+                output_path = output_filename
+            export_geotiff(
+                summed_irradiance, output_path, grass_module, compression=compression, overviews=True
+            )
+
+        return day_irradiance_rasters, summed_irradiance
+
+
+def _interpolate_and_sum(
+    key_days: list[int],
+    key_day_rasters: list[str],
+    dsm: str,
+    summed_irradiance: str,
+    grass_module,
+    sum_engine: str = "mapcalc",
+) -> dict[int, str]:
+    """Interpolate all days between the key days and sum the whole range.
+
+    The interpolated day rasters are written for callers that need them, but
+    the total comes from the weighted sum of the key day rasters (see
+    `_weighted_key_day_sum`) rather than reading every day back again.
 
+    Returns:
+        Dict mapping day-of-year to the irradiance raster for every day in the
+        range, which are left in the mapset.
+    """
     # Step 2: Interpolate to days between the key days (excluding key days themselves)
     all_days = list(range(min(key_days), max(key_days) + 1))
     key_days_set = set(key_days)
@@ -261,34 +621,165 @@ def calculate_solar_irradiance_interpolated(
         for i, day in enumerate(interp_only_days):
             day_irradiance_rasters[day] = interp_rasters[i]
 
-    # Step 3: Sum all rasters (key days + interpolated) to get total irradiance
-    all_rasters = list(day_irradiance_rasters.values())
-    summed_irradiance = f"{dsm}_solar_irradiance_interp"
-    grass_module(
-        "r.series",
-        input=",".join(all_rasters),
-        output=summed_irradiance,
-        method="sum",
-        overwrite=True,
-    ).run()
+    # Step 3: Sum all days (key days + interpolated) to get total irradiance.
+    # This equals r.series method=sum over every day raster.
+    _weighted_key_day_sum(
+        key_days,
+        key_day_rasters,
+        summed_irradiance,
+        grass_module,
+        engine=sum_engine,
+        remove_key_rasters=False,
+    )
 
-    # Optionally export the summed raster as a GeoTIFF
-    if export:
-        output_filename = f"{summed_irradiance}.tif"
-        if output_dir is not None:
-            output_path = str(Path(output_dir) / output_filename)
-        else:
-            output_path = output_filename
+    return day_irradiance_rasters
+
+
+def _key_day_weights(key_days: list[int]) -> dict[int, float]:
+    """Return the weight of each key day in the sum of the interpolated days.
+
+    With linear interpolation between consecutive key days a and b (L = b - a
+    days apart), the days strictly between them add up to (L - 1) / 2 times
+    each end's raster. Each key day therefore contributes its own value plus
+    half of the interior days on either side:
+
+        w_i = 1 + (L_before - 1) / 2 + (L_after - 1) / 2
+
+    where a missing neighbour (first/last key day) contributes nothing.
+
+    Args:
+        key_days: Day-of-year values of the key days (any order).
+
+    Returns:
+        Dict mapping each distinct key day to its weight.
+    """
+    sorted_days = sorted(set(key_days))
+    weights = {day: 1.0 for day in sorted_days}
+
+    for start_day, end_day in zip(sorted_days, sorted_days[1:]):
+        half_interior = (end_day - start_day - 1) / 2
+        weights[start_day] += half_interior
+        weights[end_day] += half_interior
+
+    return weights
+
+
+def _weighted_key_day_sum(
+    key_days: list[int],
+    key_day_rasters: list[str],
+    summed_irradiance: str,
+    grass_module,
+    engine: str = "mapcalc",
+    remove_key_rasters: bool = True,
+) -> None:
+    """Sum the linearly interpolated days directly from the key day rasters.
+
+    The sum of every day from min(key_days) to max(key_days) is a weighted sum
+    of the key day rasters (see `_key_day_weights`), so a single `r.mapcalc`
+    gives the same total as interpolating each day with `r.series.interp` and
+    summing them, without reading any per-day rasters. The key day rasters
+    are removed afterwards unless `remove_key_rasters` is False.
+
+    With `engine="numpy"` the weighted sum is computed in NumPy instead, see
+    `_weighted_sum_numpy`.
+    """
+    key_rasters_by_day = dict(zip(key_days, key_day_rasters))
+    weights = _key_day_weights(key_days)
+
+    if engine == "numpy":
+        _weighted_sum_numpy(
+            {key_rasters_by_day[day]: weight for day, weight in weights.items()},
+            summed_irradiance,
+        )
+    elif engine == "mapcalc":
+        terms = " + ".join(
+            f"{weight!r} * {key_rasters_by_day[day]}" for day, weight in weights.items()
+        )
+        # r.sun writes FCELL; keep the sum FCELL too instead of promoting to DCELL
         grass_module(
-            "r.out.gdal",
-            input=summed_irradiance,
-            output=output_path,
-            format="GTiff",
-            createopt="TFW=YES,COMPRESS=LZW",
+            "r.mapcalc",
+            expression=f"{summed_irradiance} = float({terms})",
             overwrite=True,
         ).run()
+    else:
+        raise ValueError(f"🚫 engine must be 'mapcalc' or 'numpy', got: {engine}")
+
+    if remove_key_rasters:
+        remove_rasters(key_rasters_by_day.values(), grass_module)
 
-    return day_irradiance_rasters, summed_irradiance
+
+def _fold_into_sum(
+    summed_irradiance: str,
+    day_raster: str,
+    weight: Optional[float],
+    sum_started: bool,
+    grass_module,
+) -> bool:
+    """Add one key day's weighted irradiance to the running sum and remove it.
+
+    The first key day creates `summed_irradiance`; later ones are added to it
+    through a temporary raster that is then renamed over the sum.
+
+    Args:
+        summed_irradiance: Name of the running sum raster.
+        day_raster: Name of the key day raster to add. Removed afterwards.
+        weight: Weight of the key day (see `_key_day_weights`), or None if it
+            was already added (a key day listed twice).
+        sum_started: Whether `summed_irradiance` already holds earlier days.
+        grass_module: The GRASS Python scripting Module class.
+
+    Returns:
+        Whether `summed_irradiance` now exists.
+    """
+    if weight is not None:
+        if not sum_started:
+            expression = f"{summed_irradiance} = float({weight!r} * {day_raster})"
+            grass_module("r.mapcalc", expression=expression, overwrite=True).run()
+        else:
+            partial_sum = f"{summed_irradiance}_partial"
+            grass_module(
+                "r.mapcalc",
+                expression=(
+                    f"{partial_sum} = float({summed_irradiance} + {weight!r} * {day_raster})"
+                ),
+                overwrite=True,
+            ).run()
+            grass_module(
+                "g.rename", raster=f"{partial_sum},{summed_irradiance}", overwrite=True
+            ).run()
+        sum_started = True
+
+    remove_rasters([day_raster], grass_module)
+    return sum_started
+
+
+def _weighted_sum_numpy(weights_by_raster: dict[str, float], output_name: str) -> None:
+    """Write `sum(weight * raster)` to `output_name` using NumPy arrays.
+
+    Each raster is read into a float32 array over the current region with
+    `grass.script.array`, scaled in place and added to a float32 accumulator,
+    so only one input raster and the result are held at a time. NULL cells
+    are read as NaN (`null="nan"`) and written back as NULL, so a cell that
+    is NULL on any key day is NULL in the output, as with the `r.mapcalc`
+    engine.
+
+    Args:
+        weights_by_raster: Mapping of raster name to its weight.
+        output_name: Name of the raster to write.
+    """
+    import numpy
+    from grass.script import array as garray  # type: ignore
+
+    total = garray.array(dtype=numpy.float32)
+    total[...] = 0
+
+    for raster_name, weight in weights_by_raster.items():
+        values = garray.array(raster_name, null="nan", dtype=numpy.float32)
+        numpy.multiply(values, numpy.float32(weight), out=values)
+        total += values
+        del values
+
+    total.write(output_name, null="nan", overwrite=True)
 
 
 def calculate_solar_coefficients(
@@ -313,11 +804,16 @@ def calculate_solar_coefficients(
     Returns:
         Dict mapping day-of-year (int) to coefficient raster name (str).
     """
-    day_coefficient_rasters = {}
-
-    for day, irradiance_raster in day_irradiance_rasters.items():
-        coefficient_raster = f"{dsm}_solar_percentmax_day{day}"
-        _percent_of_max_raster(irradiance_raster, coefficient_raster, grass_module)
-        day_coefficient_rasters[day] = coefficient_raster
+    day_coefficient_rasters = {
+        day: f"{dsm}_solar_percentmax_day{day}" for day in day_irradiance_rasters
+    }
+
+    _percent_of_max_rasters(
+        {
+            day_irradiance_rasters[day]: coefficient_raster
+            for day, coefficient_raster in day_coefficient_rasters.items()
+        },
+        grass_module,
+    )
 
     return day_coefficient_rasters
\ No newline at end of file
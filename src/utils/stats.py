@@ -5,21 +5,251 @@ This module provides helpers to compute per-building statistics by sampling
 rasters (clear-sky irradiance and optional WRF-adjusted irradiance) using
 GRASS vector/raster database functions. The workflow implemented here is:
 
-1. Use `v.rast.stats` to compute aggregated raster statistics (sum, count)
-   for each building polygon.
-2. Create and update attribute columns (kWh, MWh, usable sqm) using
-   `v.db.addcolumn` and `v.db.update`.
-3. Optionally compute WRF-derived statistics and a percent loss comparison
-   between the calculated clear-sky values and WRF measured values.
-4. Export results to a GeoPackage and optionally a CSV.
+1. Rasterize the building polygons by category once, then compute each
+   building's aggregated raster statistics (sum, count) from a single pass
+   over that zones raster with `r.univar` zonal statistics (the default,
+   `engine="univar"`) or NumPy (`engine="numpy"`).
+2. Optionally compute WRF-derived statistics the same way, reusing the
+   zones raster.
+3. Export results to a GeoPackage and optionally a CSV. The derived columns
+   (kWh, MWh, usable sqm and the percent loss between the calculated
+   clear-sky values and WRF measured values) are computed from the sums
+   while exporting, rather than stored in the GRASS attribute table.
+
+Steps 1 and 2 can alternatively use `v.rast.stats` (`engine="grass"`), which
+rasterizes the buildings again for every raster.
 """
 
+import csv
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import PIPE
 from typing import Any, Optional
 from pathlib import Path
 
+from utils.grass_utils import remove_rasters
+
+STATS_ENGINES = ("grass", "numpy", "univar")
+
+# Raster rows read at a time by the NumPy zonal statistics
+ZONAL_BLOCK_ROWS = 1024
+
+# Columns derived from the per-building sums (in Wh) and pixel counts, as
+# name -> (GeoPackage column type, SQL expression). They are only computed
+# for the exported GeoPackage and CSV.
+_ROOF_COLUMNS = {
+    "roof_kwh": ("REAL", "CAST(roof_sum AS DOUBLE PRECISION) / 1000.0"),
+    "roof_mwh": ("REAL", "CAST(roof_sum AS DOUBLE PRECISION) / 1000000.0"),
+    "usable_sqm": ("INTEGER", "roof_number"),
+}
+_WRF_COLUMNS = {
+    "wrf_mwh": ("REAL", "CAST(wrf_sum AS DOUBLE PRECISION) / 1000000.0"),
+    # (calculated - measured) / calculated * 100
+    "percent_loss": (
+        "REAL",
+        "((CAST(roof_sum AS DOUBLE PRECISION) - CAST(wrf_sum AS DOUBLE PRECISION)) "
+        "/ CAST(roof_sum AS DOUBLE PRECISION)) * 100.0",
+    ),
+}
+
+
+def _rasterize_building_zones(building_outlines: str, grass_module: Any) -> str:
+    """Rasterize the building polygons by category for the zonal engines.
+
+    Returns:
+        The name of the created zones raster.
+    """
+    zones_raster = f"{building_outlines}_zones"
+    grass_module(
+        "v.to.rast",
+        input=building_outlines,
+        output=zones_raster,
+        type="area",
+        use="cat",
+        overwrite=True,
+    ).run()
+
+    return zones_raster
+
+
+def _zonal_stats_numpy(
+    building_outlines: str,
+    raster: str,
+    zones_raster: str,
+    column_prefix: str,
+    grass_module: Any,
+    block_rows: int = ZONAL_BLOCK_ROWS,
+) -> None:
+    """NumPy equivalent of `v.rast.stats method=sum,number`.
+
+    Both rasters are read over the current region in blocks of `block_rows`
+    rows, and the per-building sum and count of non-NULL cells of each block
+    come from one `numpy.bincount` pass each and are added to running totals.
+    Only one block of each raster is held in memory at a time. When Numba is
+    installed, each block is reduced by the parallel `zonal_sum_count` kernel
+    instead, without the intermediate float64 copies. The results are written
+    to `<column_prefix>_sum` and `<column_prefix>_number` in one transaction;
+    buildings without any cells keep NULL values, as with `v.rast.stats`.
+
+    Args:
+        building_outlines: Name of the building polygon vector map in GRASS.
+        raster: Name of the raster to aggregate.
+        zones_raster: Building category raster from `_rasterize_building_zones`.
+        column_prefix: Prefix of the columns to create and fill.
+        grass_module: The GRASS Python scripting Module class.
+        block_rows: Number of raster rows read at a time.
+    """
+    import numpy
+    from grass.pygrass.raster import RasterRow  # type: ignore
+
+    from utils.zonal import NUMBA_AVAILABLE
+
+    if NUMBA_AVAILABLE:
+        from utils.zonal import zonal_sum_count
+
+    zones_map = RasterRow(zones_raster)
+    values_map = RasterRow(raster)
+    zones_map.open("r")
+    values_map.open("r")
+    try:
+        # Totals are indexed by building category
+        n_zones = int(zones_map.info.max or 0) + 1
+        sums = numpy.zeros(n_zones)
+        counts = numpy.zeros(n_zones, dtype=numpy.int64)
+
+        n_rows = zones_map.info.rows
+        for start in range(0, n_rows, block_rows):
+            block = range(start, min(start + block_rows, n_rows))
+            # NULL zones are read as the most negative integer, NULL values as NaN
+            zones = numpy.stack([zones_map.get_row(row) for row in block])
+            values = numpy.stack([values_map.get_row(row) for row in block])
+
+            if NUMBA_AVAILABLE:
+                zonal_sum_count(zones, values, sums, counts)
+                continue
+
+            valid = (zones > 0) & ~numpy.isnan(values)
+            zone_ids = zones[valid]
+            sums += numpy.bincount(
+                zone_ids, weights=values[valid].astype(numpy.float64), minlength=n_zones
+            )
+            counts += numpy.bincount(zone_ids, minlength=n_zones)
+    finally:
+        zones_map.close()
+        values_map.close()
+
+    _write_zonal_stats(
+        building_outlines,
+        {int(cat): (float(sums[cat]), int(counts[cat])) for cat in numpy.flatnonzero(counts)},
+        column_prefix,
+        grass_module,
+    )
+
+
+def _zonal_stats_univar(
+    building_outlines: str,
+    raster: str,
+    zones_raster: str,
+    column_prefix: str,
+    grass_module: Any,
+) -> None:
+    """`r.univar` equivalent of `v.rast.stats method=sum,number`.
+
+    A single `r.univar -t` run with the building category raster as zones
+    gives the sum and count of non-NULL cells for every building in one scan
+    of `raster`, instead of one pass per building. Results are written like
+    `_zonal_stats_numpy`.
+
+    Args:
+        building_outlines: Name of the building polygon vector map in GRASS.
+        raster: Name of the raster to aggregate.
+        zones_raster: Building category raster from `_rasterize_building_zones`.
+        column_prefix: Prefix of the columns to create and fill.
+        grass_module: The GRASS Python scripting Module class.
+    """
+    r_univar = grass_module(
+        "r.univar",
+        map=raster,
+        zones=zones_raster,
+        flags="t",
+        separator="comma",
+        stdout_=PIPE,
+    )
+    r_univar.run()
+
+    stats = {}
+    for row in csv.DictReader(r_univar.outputs.stdout.splitlines()):
+        count = int(row["non_null_cells"])
+        if count:
+            stats[int(row["zone"])] = (float(row["sum"]), count)
+
+    _write_zonal_stats(building_outlines, stats, column_prefix, grass_module)
+
+
+def _write_zonal_stats(
+    building_outlines: str,
+    stats: dict[int, tuple[float, int]],
+    column_prefix: str,
+    grass_module: Any,
+) -> None:
+    """Write per-building sums and counts to `<column_prefix>_sum`/`_number`.
+
+    The columns are added and filled with one UPDATE per building in a
+    single `db.execute` transaction. Buildings missing from `stats` keep NULL
+    values, as with `v.rast.stats`.
+
+    Args:
+        building_outlines: Name of the building polygon vector map in GRASS.
+        stats: Mapping of building category to its (sum, cell count).
+        column_prefix: Prefix of the columns to create and fill.
+        grass_module: The GRASS Python scripting Module class.
+    """
+    # The attribute table of a vector in the mapset shares its name
+    statements = [
+        f"ALTER TABLE {building_outlines} ADD COLUMN {column_prefix}_sum DOUBLE PRECISION;",
+        f"ALTER TABLE {building_outlines} ADD COLUMN {column_prefix}_number INTEGER;",
+    ]
+    # One UPDATE per building with cells
+    for cat, (total, count) in stats.items():
+        statements.append(
+            f"UPDATE {building_outlines} SET {column_prefix}_sum = {total!r}, "
+            f"{column_prefix}_number = {count} WHERE cat = {cat};"
+        )
+
+    _execute_sql(statements, grass_module)
+
+
+def _execute_sql(statements: list[str], grass_module: Any) -> None:
+    """Run SQL statements in a single transaction with one `db.execute` call.
+
+    The statements are written to a temporary file for `db.execute input=`,
+    so there's no limit on how many are run together.
+
+    Args:
+        statements: SQL statements, each ending with a semicolon.
+        grass_module: The GRASS Python scripting Module class.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".sql", delete=False) as sql_file:
+        sql_file.write("\n".join(["BEGIN TRANSACTION;", *statements, "COMMIT;"]))
+        sql_path = sql_file.name
+
+    try:
+        grass_module("db.execute", input=sql_path).run()
+    finally:
+        os.remove(sql_path)
+
+
+# Zonal statistics functions for the engines using a building category raster
+_ZONAL_STATS = {"numpy": _zonal_stats_numpy, "univar": _zonal_stats_univar}
+
 
 def _calculate_clear_sky_stats(
-    building_outlines: str, rooftop_raster: str, grass_module: Any
+    building_outlines: str,
+    rooftop_raster: str,
+    grass_module: Any,
+    zones_raster: Optional[str] = None,
+    engine: str = "grass",
 ) -> str:
     """Calculate clear-sky solar irradiance statistics for building outlines.
 
@@ -27,113 +257,124 @@ def _calculate_clear_sky_stats(
       - `roof_sum`: the sum of raster pixel values overlapping each building
       - `roof_number`: the count of pixels used in the sum
 
-    It then adds and populates some derived columns:
-    `roof_kwh`, `roof_mwh`, `usable_sqm`
+    The derived `roof_kwh`, `roof_mwh` and `usable_sqm` columns are added
+    when exporting, see `_export_combined_stats`.
 
     Args:
         building_outlines: Name of the building polygon vector map in GRASS.
         rooftop_raster: Name of the raster containing per-pixel irradiance
             (expected units: Wh per pixel over the period).
         grass_module: The GRASS Python scripting Module class.
+        zones_raster: Building category raster, required by the "numpy" and
+            "univar" engines.
+        engine: One of `STATS_ENGINES`, see `create_stats`.
 
     Returns:
         The input `building_outlines` vector name.
     """
     # Compute per-feature raster statistics: sum and number of pixels
-    v_rast_stats = grass_module(
-        "v.rast.stats",
-        map=building_outlines,
-        raster=rooftop_raster,
-        column_prefix="roof",
-        method=["sum", "number"],
-        flags="c",
-    )
-    v_rast_stats.run()
-
-    # Add columns for kWh, MWh and usable area (pixel count)
-    v_db_addcolumn = grass_module(
-        "v.db.addcolumn",
-        map=building_outlines,
-        columns=[
-            "roof_kwh DOUBLE PRECISION",
-            "roof_mwh DOUBLE PRECISION",
-            "usable_sqm INTEGER",
-        ],
-    )
-    v_db_addcolumn.run()
-
-    # Populate kWh and MWh columns by converting roof_sum (Wh) to larger units
-    v_db_update_kwh = grass_module(
-        "v.db.update",
-        map=building_outlines,
-        column="roof_kwh",
-        query_column="CAST(roof_sum AS DOUBLE PRECISION) / 1000.0",
-    )
-    v_db_update_kwh.run()
-
-    v_db_update_mwh = grass_module(
-        "v.db.update",
-        map=building_outlines,
-        column="roof_mwh",
-        query_column="CAST(roof_sum AS DOUBLE PRECISION) / 1000000.0",
-    )
-    v_db_update_mwh.run()
-
-    # Copy pixel count into usable_sqm
-    v_db_update_pixels = grass_module(
-        "v.db.update",
-        map=building_outlines,
-        column="usable_sqm",
-        query_column="roof_number",
-    )
-    v_db_update_pixels.run()
+    if engine != "grass":
+        _ZONAL_STATS[engine](
+            building_outlines, rooftop_raster, zones_raster, "roof", grass_module
+        )
+    else:
+        v_rast_stats = grass_module(
+            "v.rast.stats",
+            map=building_outlines,
+            raster=rooftop_raster,
+            column_prefix="roof",
+            method=["sum", "number"],
+            flags="c",
+        )
+        v_rast_stats.run()
 
     return building_outlines
 
 
 def _calculate_wrf_stats(
-    building_outlines: str, wrf_raster: str, grass_module: Any
+    building_outlines: str,
+    wrf_raster: str,
+    grass_module: Any,
+    zones_raster: Optional[str] = None,
+    engine: str = "grass",
 ) -> str:
     """Calculate statistics from a WRF-derived raster for building outlines.
 
     This computes a per-building sum of raster pixel values from the provided
-    `wrf_raster` and creates a `wrf_mwh` column containing the summed value in MWh.
+    `wrf_raster` into `wrf_sum`. The summed value in MWh (`wrf_mwh`) is added
+    when exporting, see `_export_combined_stats`.
 
     Args:
         building_outlines: Name of the building polygon vector in GRASS.
         wrf_raster: Name of the WRF-derived raster in GRASS (same units as rooftop raster).
         grass_module: The GRASS Python scripting Module class.
+        zones_raster: Building category raster, required by the "numpy" and
+            "univar" engines.
+        engine: One of `STATS_ENGINES`, see `create_stats`.
 
     Returns:
         The input `building_outlines` vector name.
     """
     # Compute per-building sum for the WRF raster
-    v_rast_stats_wrf = grass_module(
-        "v.rast.stats",
-        map=building_outlines,
-        raster=wrf_raster,
-        column_prefix="wrf",
-        method=["sum"],
-        flags="c",
-    )
-    v_rast_stats_wrf.run()
+    if engine != "grass":
+        _ZONAL_STATS[engine](building_outlines, wrf_raster, zones_raster, "wrf", grass_module)
+    else:
+        v_rast_stats_wrf = grass_module(
+            "v.rast.stats",
+            map=building_outlines,
+            raster=wrf_raster,
+            column_prefix="wrf",
+            method=["sum"],
+            flags="c",
+        )
+        v_rast_stats_wrf.run()
 
-    # Add column for summed WRF values in MWh
-    v_db_addcolumn = grass_module(
-        "v.db.addcolumn",
-        map=building_outlines,
-        columns=["wrf_mwh DOUBLE PRECISION"],
-    )
-    v_db_addcolumn.run()
+    return building_outlines
 
-    # Populate wrf_mwh by converting wrf_sum (Wh) to MWh
-    v_db_update_wrf_mwh = grass_module(
-        "v.db.update",
-        map=building_outlines,
-        column="wrf_mwh",
-        query_column="CAST(wrf_sum AS DOUBLE PRECISION) / 1000000.0",
+
+def _calculate_grass_stats_concurrently(
+    building_outlines: str,
+    rooftop_raster: str,
+    wrf_raster: str,
+    grass_module: Any,
+) -> str:
+    """Run the clear-sky and WRF `v.rast.stats` passes at the same time.
+
+    `v.rast.stats` runs on a single core and adds columns to the map it reads,
+    so the WRF stats are computed on a copy of `building_outlines` while the
+    clear-sky stats run on the original. `wrf_sum` is then copied across by
+    category in one `UPDATE` and the copy is removed.
+
+    Args:
+        building_outlines: Name of the building polygon vector map in GRASS.
+        rooftop_raster: Name of the clear-sky irradiance raster.
+        wrf_raster: Name of the WRF-derived raster.
+        grass_module: The GRASS Python scripting Module class.
+
+    Returns:
+        The input `building_outlines` vector name.
+    """
+    wrf_copy = f"{building_outlines}_wrf_stats"
+    grass_module("g.copy", vector=f"{building_outlines},{wrf_copy}", overwrite=True).run()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        clear_sky_future = executor.submit(
+            _calculate_clear_sky_stats, building_outlines, rooftop_raster, grass_module
+        )
+        wrf_future = executor.submit(_calculate_wrf_stats, wrf_copy, wrf_raster, grass_module)
+        clear_sky_future.result()
+        wrf_future.result()
+
+    # The attribute table of a vector in the mapset shares its name
+    _execute_sql(
+        [
+            f"ALTER TABLE {building_outlines} ADD COLUMN wrf_sum DOUBLE PRECISION;",
+            f"UPDATE {building_outlines} SET wrf_sum = "
+            f"(SELECT wrf_sum FROM {wrf_copy} WHERE {wrf_copy}.cat = {building_outlines}.cat);",
+        ],
+        grass_module,
     )
-    v_db_update_wrf_mwh.run()
+    grass_module("g.remove", type="vector", name=wrf_copy, flags="f").run()
 
     return building_outlines
 
@@ -149,10 +390,18 @@ def _export_combined_stats(
     """Combine statistics, compute comparison metrics, and export results.
 
     Steps:
-      - Filter out features without `roof_sum` (only export buildings with values).
       - Add an `area_sqm` attribute and populate it.
-      - If WRF data is present, add and compute a `percent_loss`.
-      - Optionally export CSV and always export a GeoPackage with stats.
+      - If WRF data is present, also export `wrf_mwh` and `percent_loss`.
+      - Export a GeoPackage with stats, and optionally a CSV from it.
+
+    Only buildings that have a `roof_sum` (i.e. overlap the rooftop raster) are
+    exported. Rather than copying those buildings into a new vector map, the
+    filter is applied while exporting, with a `where` clause on `v.out.ogr`.
+
+    The derived columns (`_ROOF_COLUMNS`, plus `_WRF_COLUMNS` with WRF) aren't
+    stored in the GRASS attribute table: they are added to the GeoPackage
+    after export. The CSV is then written from the GeoPackage with GDAL, so
+    the attribute table is only read once.
 
     Args:
         area: Base name for output files (used in file naming).
@@ -164,49 +413,22 @@ def _export_combined_stats(
     Returns:
         The path to the generated GeoPackage file containing building statistics.
     """
-    # Keep only buildings that have roof_sum (skip features without raster overlap)
-    v_extract = grass_module(
-        "v.extract",
-        input=building_outlines,
-        output="filtered_buildings",
-        where="roof_sum IS NOT NULL",
-        overwrite=True,
-    )
-    v_extract.run()
-
     # Add area column to store building area
     v_db_addcolumn = grass_module(
         "v.db.addcolumn",
-        map="filtered_buildings",
+        map=building_outlines,
         columns=["area_sqm DOUBLE PRECISION"],
     )
     v_db_addcolumn.run()
 
-    # If WRF stats are available, add a percent_loss column and compute it
+    derived_columns = dict(_ROOF_COLUMNS)
     if has_wrf:
-        v_db_addcolumn_wrf = grass_module(
-            "v.db.addcolumn",
-            map="filtered_buildings",
-            columns=["percent_loss DOUBLE PRECISION"],
-        )
-        v_db_addcolumn_wrf.run()
-
-        # Compute percentage loss: (calculated - measured) / calculated * 100
-        v_db_update_percent_loss = grass_module(
-            "v.db.update",
-            map="filtered_buildings",
-            column="percent_loss",
-            query_column=(
-                "((CAST(roof_sum AS DOUBLE PRECISION) - CAST(wrf_sum AS DOUBLE PRECISION)) "
-                "/ CAST(roof_sum AS DOUBLE PRECISION)) * 100.0"
-            ),
-        )
-        v_db_update_percent_loss.run()
+        derived_columns.update(_WRF_COLUMNS)
 
     # Populate area_sqm by computing geometry area in meters
     v_db_update_area = grass_module(
         "v.to.db",
-        map="filtered_buildings",
+        map=building_outlines,
         option="area",
         columns="area_sqm",
         units="meters",
@@ -214,36 +436,91 @@ def _export_combined_stats(
     )
     v_db_update_area.run()
 
-    # Optionally export a CSV summary (columns depend on WRF presence)
-    if output_csv:
-        if has_wrf:
-            columns = "roof_mwh, wrf_mwh, percent_loss, area_sqm, usable_sqm"
-        else:
-            columns = "roof_mwh, area_sqm, usable_sqm"
-
-        v_db_select = grass_module(
-            "v.db.select",
-            map="filtered_buildings",
-            columns=columns,
-            where="roof_sum IS NOT NULL",
-            file=f"{str(output_dir)}/{area}_building_stats.csv",
-            separator=",",
-            overwrite=True,
-        )
-        v_db_select.run()
-
-    # Export filtered buildings (with attributes) to a GeoPackage
+    # Export buildings that have roof_sum (with attributes) to a GeoPackage,
+    # skipping features without raster overlap
+    gpkg_file = f"{str(output_dir)}/{area}_building_stats.gpkg"
     v_out_ogr = grass_module(
         "v.out.ogr",
-        input="filtered_buildings",
-        output=f"{str(output_dir)}/{area}_building_stats.gpkg",
+        input=building_outlines,
+        output=gpkg_file,
         format="GPKG",
         output_layer="building_stats",
+        where="roof_sum IS NOT NULL",
         overwrite=True,
     )
     v_out_ogr.run()
 
-    return f"{str(output_dir)}/{area}_building_stats.gpkg"
+    _add_derived_gpkg_columns(gpkg_file, "building_stats", derived_columns)
+
+    # Optionally export a CSV summary (columns depend on WRF presence)
+    if output_csv:
+        if has_wrf:
+            columns = ["roof_mwh", "wrf_mwh", "percent_loss", "area_sqm", "usable_sqm"]
+        else:
+            columns = ["roof_mwh", "area_sqm", "usable_sqm"]
+        _export_gpkg_csv(
+            gpkg_file, "building_stats", columns, f"{str(output_dir)}/{area}_building_stats.csv"
+        )
+
+    return gpkg_file
+
+
+def _add_derived_gpkg_columns(
+    gpkg_file: str, layer: str, derived_columns: dict[str, tuple[str, str]]
+) -> None:
+    """Add and fill the derived columns of a GeoPackage layer in place.
+
+    Args:
+        gpkg_file: Path to the GeoPackage written by `v.out.ogr`.
+        layer: Name of the layer to update.
+        derived_columns: Mapping of column name to (column type, SQL
+            expression), e.g. `_ROOF_COLUMNS`.
+    """
+    from osgeo import gdal
+
+    gdal.UseExceptions()
+
+    dataset = gdal.OpenEx(gpkg_file, gdal.OF_VECTOR | gdal.OF_UPDATE)
+    try:
+        for name, (column_type, _) in derived_columns.items():
+            dataset.ExecuteSQL(f'ALTER TABLE "{layer}" ADD COLUMN {name} {column_type}')
+        assignments = ", ".join(
+            f"{name} = {expression}" for name, (_, expression) in derived_columns.items()
+        )
+        dataset.ExecuteSQL(f'UPDATE "{layer}" SET {assignments}')
+    finally:
+        # Close the dataset to flush the changes
+        dataset = None
+
+
+def _export_gpkg_csv(gpkg_file: str, layer: str, columns: list[str], csv_file: str) -> str:
+    """Write selected attribute columns of a GeoPackage layer to a CSV file.
+
+    Args:
+        gpkg_file: Path to the GeoPackage to read.
+        layer: Name of the layer to export.
+        columns: Names of the columns to write, in order.
+        csv_file: Path of the CSV file to write (overwritten if it exists).
+
+    Returns:
+        The `csv_file` path for convenience.
+    """
+    from osgeo import gdal
+
+    gdal.UseExceptions()
+
+    # The CSV driver can't overwrite an existing file in place
+    if os.path.exists(csv_file):
+        os.remove(csv_file)
+
+    gdal.VectorTranslate(
+        csv_file,
+        gpkg_file,
+        format="CSV",
+        SQLStatement=f'SELECT {", ".join(columns)} FROM "{layer}"',
+    )
+
+    return csv_file
 
 
 def create_stats(
@@ -254,6 +531,7 @@ def create_stats(
     grass_module: Any,
     wrf_raster: Optional[str] = None,
     output_csv: bool = True,
+    engine: str = "univar",
 ) -> str:
     """High-level workflow to produce building-level rooftop irradiance statistics.
 
@@ -264,21 +542,47 @@ def create_stats(
         grass_module: The GRASS Python scripting Module class.
         wrf_raster: Optional GRASS raster name for WRF-adjusted irradiance.
         output_csv: If True, also export a CSV summary. Defaults to True.
+        engine: How per-building sums are computed. "univar" (default) and
+            "numpy" rasterize the buildings once and reuse that zones raster
+            for every raster, with a single pass each: `r.univar` zonal
+            statistics, or NumPy arrays read in blocks of `ZONAL_BLOCK_ROWS`
+            rows. "grass" uses `v.rast.stats`, which rasterizes the buildings
+            again for each raster.
 
     Returns:
         Path to the generated GeoPackage file containing building statistics.
+
+    Raises:
+        ValueError: If `engine` is not one of `STATS_ENGINES`.
     """
-    # Compute clear-sky (calculated) stats and update vector attributes
-    building_outlines = _calculate_clear_sky_stats(
-        building_outlines, rooftop_raster, grass_module
-    )
+    if engine not in STATS_ENGINES:
+        raise ValueError(f"🚫 engine must be one of {STATS_ENGINES}, got: {engine}")
+
+    zones_raster = None
+    if engine != "grass":
+        zones_raster = _rasterize_building_zones(building_outlines, grass_module)
 
-    # Optionally compute WRF-derived stats
     has_wrf = wrf_raster is not None
-    if has_wrf:
-        building_outlines = _calculate_wrf_stats(
-            building_outlines, wrf_raster, grass_module
-        )
+    try:
+        if has_wrf and engine == "grass":
+            # Both v.rast.stats runs make a pass per building; overlap them
+            _calculate_grass_stats_concurrently(
+                building_outlines, rooftop_raster, wrf_raster, grass_module
+            )
+        else:
+            # Compute clear-sky (calculated) stats and update vector attributes
+            building_outlines = _calculate_clear_sky_stats(
+                building_outlines, rooftop_raster, grass_module, zones_raster=zones_raster, engine=engine
+            )
+
+            # Optionally compute WRF-derived stats
+            if has_wrf:
+                building_outlines = _calculate_wrf_stats(
+                    building_outlines, wrf_raster, grass_module, zones_raster=zones_raster, engine=engine
+                )
+    finally:
+        # The zones raster is only needed for the zonal statistics
+        remove_rasters([zones_raster], grass_module)
 
     # Export combined stats to GeoPackage and optionally CSV
     gpkg_file = _export_combined_stats(
@@ -8,10 +8,11 @@ High level responsibilities:
 - Read WRF NetCDF files via xarray and manage the CRS, including reprojections,
   and creating per-day WRF rasters.
 - Helpers to multiply WRF rasters by normalized coefficient rasters,
-  sum per-day adjusted rasters, and produce a summed WRF raster for comparison
-  against clear-sky modeled values.
+  sum per-day adjusted rasters (or do both in fused `r.mapcalc` passes), and
+  produce a summed WRF raster for comparison against clear-sky modeled values.
 """
 
+import functools
 import os
 import tempfile
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
@@ -23,11 +24,18 @@ from utils.logging_config import get_logger
 logger = get_logger(__name__)
 
 from .building_outlines import apply_building_mask, remove_masks
+from .grass_utils import remove_rasters
 
 
 def _load_wrf_with_crs(nc_file_path: str, crs: str = "EPSG:4326") -> xr.Dataset:
     """Open a WRF NetCDF with xarray and attach a CRS using rioxarray.
 
+    The opened dataset is cached per `(nc_file_path, crs)`, so repeated calls
+    (e.g. a sweep over several areas) don't re-open the file and re-parse its
+    metadata. Each call returns a shallow copy, so callers can rename or
+    subset it without changing the cached dataset. Use `close_wrf_cache` to
+    release the cached datasets.
+
     Args:
         nc_file_path: Path to the WRF NetCDF file.
         crs: CRS string to attach to the dataset (default EPSG:4326).
@@ -35,42 +43,51 @@ def _load_wrf_with_crs(nc_file_path: str, crs: str = "EPSG:4326") -> xr.Dataset:
     Returns:
         An xarray.Dataset with rioxarray spatial metadata attached.
     """
+    return _open_wrf_with_crs(nc_file_path, crs).copy(deep=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _open_wrf_with_crs(nc_file_path: str, crs: str) -> xr.Dataset:
+    """Open a WRF NetCDF once per file and CRS. See `_load_wrf_with_crs`."""
     ds = xr.open_dataset(nc_file_path, engine="h5netcdf")
+    return _ensure_spatial(ds, crs)
+
+
+def _ensure_spatial(ds: xr.Dataset, crs: str) -> xr.Dataset:
+    """Give a WRF dataset the coordinate names and CRS rioxarray expects.
+
+    Each step is skipped if the dataset already has it, so this can be called
+    on datasets that were (partly) prepared before.
+
+    Args:
+        ds: WRF dataset with `lon`/`lat` or `x`/`y` coordinates.
+        crs: CRS string to attach if the dataset has none.
+
+    Returns:
+        The dataset with `x`/`y` spatial dims and a CRS.
+    """
     # Standardize coordinate names for rioxarray compatibility
-    ds = ds.rename({"lon": "x", "lat": "y"})
+    if "lon" in ds.coords:
+        ds = ds.rename({"lon": "x", "lat": "y"})
 
     # Write CRS and spatial dimension metadata in-place
-    ds.rio.write_crs(crs, inplace=True)
+    if ds.rio.crs is None:
+        ds.rio.write_crs(crs, inplace=True)
     ds.rio.set_spatial_dims(x_dim="x", y_dim="y", inplace=True)
 
     return ds
 
 
-def _clip_raster_to_region(
-    raster_name: str, output_name: str, grass_module: Any
-) -> str:
-    """Clip/copy a GRASS raster to the current computational region.
+def close_wrf_cache() -> None:
+    """Drop the WRF datasets cached by `_load_wrf_with_crs`.
 
-    This helper produces a new raster whose values match `raster_name` but
-    conform to the current GRASS computational region (resolution/extent).
-
-    Args:
-        raster_name: Source raster name in GRASS.
-        output_name: Destination raster name to create in GRASS.
-        grass_module: The GRASS Python scripting Module class.
+    xarray closes each file once the last reference to it (including any
+    copies returned to callers) is gone.
 
     Returns:
-        The created raster name (`output_name`).
+        None
     """
-    r_mapcalc = grass_module(
-        "r.mapcalc",
-        expression=f"{output_name} = {raster_name}",
-        overwrite=True,
-        quiet=True,
-    )
-    r_mapcalc.run()
-
-    return output_name
+    _open_wrf_with_crs.cache_clear()
 
 
 def _import_wrf_to_grass(
@@ -79,16 +96,24 @@ def _import_wrf_to_grass(
     grass_module: Any,
     days: Iterable[int],
     clip_to_raster: Optional[str] = None,
+    nprocs: Optional[int] = None,
 ) -> Dict[int, str]:
     """Import per-day WRF fields into GRASS as individual rasters.
 
     This function:
-    - Determines the subset of days available in the dataset within the
-      requested `days` iterable.
-    - For each day, writes a temporary GeoTIFF for the day and imports it into
-      GRASS using `r.in.gdal`.
-    - Optionally clips the imported raster to a provided GRASS raster by
-      setting the region before clipping and removing the un-clipped raster.
+    - Determines which of the requested `days` are available in the dataset.
+    - Selects all of those days in one pass and writes them to a single
+      temporary multi-band GeoTIFF (one band per day), then imports each band
+      into GRASS using `r.in.gdal band=<n>`.
+    - Optionally clips the imported raster to the current region, which the
+      caller must already have set to `clip_to_raster`, and removes the
+      un-clipped raster.
+      In that case each band is only linked with `r.external` rather than
+      copied, since the clip is the only read of it before the temporary
+      GeoTIFF is removed.
+
+    The per-day import (and clip) chains are independent, so they run
+    concurrently on a `ParallelModuleQueue`.
 
     Args:
         wrf_dataset: xarray Dataset containing a `dayofyear` coordinate and
@@ -97,67 +122,111 @@ def _import_wrf_to_grass(
         grass_module: GRASS Module-like callable used to run imports.
         days: Iterable of day-of-year integers to import (subset of dataset days).
         clip_to_raster: If provided, the GRASS raster name to which the imported
-            rasters should be clipped (region set to this raster).
+            rasters should be clipped. The region is not changed here (this
+            may run alongside other GRASS modules that read it), so it must
+            already match this raster, e.g. as set by `merge_rasters_native`.
+        nprocs: Number of days to import at once. Defaults to the number of
+            CPUs.
 
     Returns:
         Mapping of day-of-year (int) to created GRASS raster name.
     """
-    # Determine available days within the requested range using the dataset coord
-    min_day = min(days)
-    max_day = max(days)
-    days_to_import = wrf_dataset.dayofyear.where(
-        (wrf_dataset.dayofyear >= min_day) & (wrf_dataset.dayofyear <= max_day),
-        drop=True,
-    ).values
-
-    # If clipping to an existing GRASS raster is requested, set the region now
-    if clip_to_raster:
-        grass_module("g.region", raster=clip_to_raster).run()
+    import numpy
+
+    # Requested days present in the dataset, matched on the integer coordinate
+    # directly (only the requested days, not everything between min and max)
+    dataset_days = wrf_dataset["dayofyear"].values
+    days_to_import = dataset_days[numpy.isin(dataset_days, list(days))]
 
     imported_rasters: Dict[int, str] = {}
+    if len(days_to_import) == 0:
+        return imported_rasters
+
     temp_dir = tempfile.mkdtemp()
+    temp_tif = os.path.join(temp_dir, "wrf_days.tif")
+    # Un-clipped imports, removed together once every day is clipped
+    unclipped_rasters = []
 
     try:
-        for day in days_to_import:
+        # Write the SWDOWN variable for every day to one multi-band GeoTIFF.
+        # The caller is expected to ensure the variable exists and is named
+        # appropriately (here we use 'SWDOWN' as the conventional shortwave).
+        # rioxarray writes the non-spatial dimension as bands, in order.
+        # Writing tiled, window by window, avoids building another full copy
+        # of the (days x y x x) stack in memory for the write.
+        days_data = wrf_dataset["SWDOWN"].sel(dayofyear=days_to_import)
+        days_data.transpose("dayofyear", "y", "x").rio.to_raster(
+            temp_tif, tiled=True, windowed=True
+        )
+
+        import grass.script as gscript  # type: ignore
+        from grass.pygrass.modules import MultiModule, ParallelModuleQueue  # type: ignore
+
+        chains = []
+        for band, day in enumerate(days_to_import, start=1):
             day_int = int(day)
             raster_name = f"{output_prefix}_doy_{day_int}"
-            day_data = wrf_dataset.sel(dayofyear=day)
-
-            # TODO: do these need to be GeoTIFFs or can we use in-memory via GRASS
-            # Write the day's SWDOWN variable to a temporary GeoTIFF.
-            # The caller is expected to ensure the variable exists and is named
-            # appropriately (here we use 'SWDOWN' as the conventional shortwave).
-            temp_tif = os.path.join(temp_dir, f"wrf_day_{day_int}.tif")
-            # Use rioxarray's to_raster - this will respect the dataset's CRS/transform
-            day_data["SWDOWN"].rio.to_raster(temp_tif)
-
-            # Import the temp GeoTIFF into GRASS
-            r_in = grass_module(
-                "r.in.gdal",
-                input=temp_tif,
-                output=raster_name,
-                overwrite=True,
-                quiet=True,
-            )
-            r_in.run()
+
+            # Import (or, when clipping, just link) this day's band from the
+            # temp GeoTIFF into GRASS
+            chain = [
+                grass_module(
+                    "r.external" if clip_to_raster else "r.in.gdal",
+                    input=temp_tif,
+                    output=raster_name,
+                    band=band,
+                    overwrite=True,
+                    quiet=True,
+                    run_=False,
+                )
+            ]
 
             if clip_to_raster:
-                # Create a clipped raster that aligns with the current region
+                # Copy into a raster that aligns with the current region
                 clipped_name = f"{output_prefix}_clipped_doy_{day_int}"
-                _clip_raster_to_region(raster_name, clipped_name, grass_module)
-                # Remove the original un-clipped raster to avoid duplication
-                grass_module(
-                    "g.remove", type="raster", name=raster_name, flags="f", quiet=True
-                ).run()
+                chain.append(
+                    grass_module(
+                        "r.mapcalc",
+                        expression=f"{clipped_name} = {raster_name}",
+                        overwrite=True,
+                        quiet=True,
+                        run_=False,
+                    )
+                )
+                unclipped_rasters.append(raster_name)
                 imported_rasters[day_int] = clipped_name
             else:
                 imported_rasters[day_int] = raster_name
 
-            # Remove the temporary GeoTIFF for this day
-            os.remove(temp_tif)
+            chains.append(chain)
+
+        # Remove outputs left over from earlier runs, so only this run's
+        # imports count as imported below
+        remove_rasters(imported_rasters.values(), grass_module)
+
+        queue = ParallelModuleQueue(nprocs=nprocs or os.cpu_count() or 1)
+        for chain in chains:
+            queue.put(MultiModule(module_list=chain, sync=False))
+
+        # Block until every day has been imported. The chains run in child
+        # processes, so check which rasters exist rather than return codes.
+        queue.wait()
+        existing = set(
+            gscript.read_command(
+                "g.list", type="raster", pattern=f"{output_prefix}_*doy_*", mapset="."
+            ).split()
+        )
+        failed_days = sorted(day for day, name in imported_rasters.items() if name not in existing)
+        if failed_days:
+            raise RuntimeError(f"🚫 Importing WRF days {failed_days} into GRASS failed")
+
+        # Remove the original un-clipped rasters to avoid duplication
+        remove_rasters(unclipped_rasters, grass_module)
     finally:
-        # Attempt to remove the temporary directory if empty
+        # Remove the temporary GeoTIFF and its directory
         try:
+            if os.path.exists(temp_tif):
+                os.remove(temp_tif)
             os.rmdir(temp_dir)
         except Exception:
             # If removal fails (shouldn't), don't break the pipeline
@@ -171,10 +240,11 @@ def _sum_wrf_rasters(
     output_name: str,
     grass_module: Any,
 ) -> str:
-    """Sum multiple WRF day rasters into a single total raster using r.mapcalc.
+    """Sum multiple WRF day rasters into a single total raster using r.series.
 
-    This function constructs an expression like:
-        output = raster1 + raster2 + raster3 + ...
+    `r.series` streams the inputs row by row, so the cost stays linear in the
+    number of days instead of building one long `r.mapcalc` expression. As
+    with `+` in `r.mapcalc`, a cell is NULL if it is NULL on any day (`-n`).
 
     Args:
         wrf_rasters: Dict or iterable of raster names to sum.
@@ -192,11 +262,14 @@ def _sum_wrf_rasters(
     if not raster_list:
         raise ValueError("🚫 No WRF rasters provided to sum.")
 
-    raster_sum = " + ".join(raster_list)
-    expression = f"{output_name} = {raster_sum}"
-
-    r_mapcalc = grass_module("r.mapcalc", expression=expression, overwrite=True)
-    r_mapcalc.run()
+    grass_module(
+        "r.series",
+        input=",".join(raster_list),
+        output=output_name,
+        method="sum",
+        flags="n",
+        overwrite=True,
+    ).run()
 
     return output_name
 
@@ -246,6 +319,73 @@ def calculate_wrf_adjusted_per_day(
     return adjusted_rasters
 
 
+def calculate_wrf_adjusted_total(
+    wrf_day_rasters: Dict[int, str],
+    irradiance_rasters: Dict[int, str],
+    output_name: str,
+    grass_module: Any,
+    chunk_size: int = 50,
+) -> str:
+    """Sum WRF rasters adjusted by each day's percent-of-max solar coefficient.
+
+    Computes, for every day present in both mappings:
+
+        output = sum(wrf_day * irradiance_day / max(irradiance_day))
+
+    which is the same total as building per-day coefficient rasters with
+    `calculate_solar_coefficients`, multiplying them with
+    `calculate_wrf_adjusted_per_day` and summing with `sum_adjusted_rasters`,
+    but without writing any per-day coefficient or adjusted rasters. Days are
+    combined in `r.mapcalc` expressions of up to `chunk_size` days each, folded
+    into a running total, to keep the number of open input maps bounded.
+
+    Args:
+        wrf_day_rasters: Mapping from day-of-year to the WRF raster for that day.
+        irradiance_rasters: Mapping from day-of-year to the modelled (r.sun or
+            interpolated) irradiance raster for that day.
+        output_name: Name for the summed adjusted raster in GRASS.
+        grass_module: The GRASS Python scripting Module class.
+        chunk_size: Maximum number of days per `r.mapcalc` expression.
+
+    Returns:
+        The name of the summed raster (`output_name`).
+
+    Raises:
+        ValueError: If no day has both a WRF and an irradiance raster.
+    """
+    from .solar_irradiance import _get_raster_min_max
+
+    terms = []
+    for day, wrf_raster in wrf_day_rasters.items():
+        # If irradiance is missing for a day, skip with a warning
+        if day not in irradiance_rasters:
+            logger.warning("No irradiance raster for day %s, skipping", day)
+            continue
+
+        irradiance_raster = irradiance_rasters[day]
+        # Percent-of-max coefficient for the day, inlined into the expression
+        _, max_val = _get_raster_min_max(irradiance_raster)
+        terms.append(f"{wrf_raster} * float({irradiance_raster}) / float({max_val})")
+
+    if not terms:
+        raise ValueError("🚫 No days with both WRF and irradiance rasters to adjust.")
+
+    acc_tmp = f"{output_name}_tmp"
+    for i in range(0, len(terms), chunk_size):
+        chunk = " + ".join(terms[i : i + chunk_size])
+        if i == 0:
+            expression = f"{output_name} = float({chunk})"
+        else:
+            expression = f"{acc_tmp} = float({output_name} + {chunk})"
+
+        grass_module("r.mapcalc", expression=expression, overwrite=True).run()
+
+        if i > 0:
+            grass_module("g.rename", raster=f"{acc_tmp},{output_name}", overwrite=True).run()
+
+    return output_name
+
+
 def sum_adjusted_rasters(
     adjusted_rasters: Union[Dict[int, str], Iterable[str]],
     output_name: str,
@@ -281,13 +421,8 @@ def sum_adjusted_rasters(
     ).run()
 
     # Optionally remove intermediate rasters to keep the GRASS mapset tidy
-    if cleanup and raster_list:
-        grass_module(
-            "g.remove",
-            type="raster",
-            name=",".join(raster_list),
-            flags="f",
-        ).run()
+    if cleanup:
+        remove_rasters(raster_list, grass_module)
 
     return output_name
 
@@ -341,15 +476,7 @@ def cleanup_wrf_intermediates(
     else:
         raster_list = list(day_rasters)
 
-    for raster in raster_list:
-        grass_module(
-            "g.remove", type="raster", name=raster, flags="f", quiet=True
-        ).run()
-
-    if summed_raster:
-        grass_module(
-            "g.remove", type="raster", name=summed_raster, flags="f", quiet=True
-        ).run()
+    remove_rasters([*raster_list, summed_raster], grass_module)
 
 
 def process_wrf_for_grass(
@@ -370,10 +497,12 @@ def process_wrf_for_grass(
         grass_module: The GRASS Python scripting Module class.
         source_crs: CRS to attach to the raw WRF dataset (default EPSG:4326).
         target_crs: If provided, reproject the dataset to this CRS before import.
-        days: Iterable of day-of-year integers to import. If None, the function
-            imports the full range present in the dataset.
-        clip_to_raster: If provided, set the GRASS region to this raster and
-            clip imported rasters to that region.
+        days: Iterable of day-of-year integers to import. Only these days are
+            imported, so pass every day in a range rather than its endpoints.
+            If None, the function imports every day present in the dataset.
+        clip_to_raster: If provided, clip imported rasters to the current
+            region, which must already be set to this raster (the region is
+            not changed here).
         print_diagnostics: If True, call the diagnostics helper to print dataset
             metadata.
 
@@ -386,23 +515,26 @@ def process_wrf_for_grass(
     if print_diagnostics:
         from .diagnostics import print_wrf_diagnostics
 
-        wrf_ds = print_wrf_diagnostics(nc_file_path)
-
         # Ensure expected coordinate names and metadata for subsequent operations
-        wrf_ds = wrf_ds.rename({"lon": "x", "lat": "y"})
-        wrf_ds.rio.write_crs(source_crs, inplace=True)
-        wrf_ds.rio.set_spatial_dims(x_dim="x", y_dim="y", inplace=True)
+        wrf_ds = _ensure_spatial(print_wrf_diagnostics(nc_file_path), source_crs)
     else:
         wrf_ds = _load_wrf_with_crs(nc_file_path, crs=source_crs)
 
-    # Reproject to the target CRS if requested
-    if target_crs:
-        wrf_ds = wrf_ds.rio.reproject(target_crs)
-
     # If days is not provided infer the full range from dataset dayofyear values
     if days is None:
         # Convert to a sorted list of unique dayofyear integers present in dataset
         days = sorted(int(d) for d in xr.DataArray(wrf_ds["dayofyear"]).values)
+    else:
+        days = list(days)
+
+    # The dataset is opened lazily; keep only the variable and days that are
+    # imported, so reprojection doesn't read and warp the whole cube
+    if days:
+        wrf_ds = wrf_ds[["SWDOWN"]].sel(dayofyear=wrf_ds.dayofyear.isin(days))
+
+    # Reproject to the target CRS if requested
+    if target_crs:
+        wrf_ds = wrf_ds.rio.reproject(target_crs)
 
     imported_rasters = _import_wrf_to_grass(
         wrf_ds, output_prefix, grass_module, days, clip_to_raster
@@ -0,0 +1,58 @@
+"""
+Compiled zonal statistics kernels for the per-building statistics.
+
+These kernels use Numba when it is installed (`pip install ".[numba]"`) and
+run in parallel over rows. `NUMBA_AVAILABLE` is False without Numba, in which
+case callers should keep using the equivalent NumPy code.
+"""
+
+import numpy
+
+try:
+    from numba import get_num_threads, njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is an optional dependency
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def zonal_sum_count(
+        zones: numpy.ndarray,
+        values: numpy.ndarray,
+        sums: numpy.ndarray,
+        counts: numpy.ndarray,
+    ) -> None:
+        """Add the per-zone sum and count of the non-NaN `values` to the totals.
+
+        Rows are split between the threads, each accumulating into its own
+        totals, which are added to `sums` and `counts` at the end. Every cell is
+        read once, without the float64 weights copy `numpy.bincount` needs.
+        Zones outside 1..len(sums) - 1 (e.g. GRASS NULL) are skipped.
+
+        Args:
+            zones: 2D integer array of zone ids (building categories).
+            values: 2D float array of values, same shape as `zones`.
+            sums: 1D float64 array of per-zone sums, updated in place.
+            counts: 1D int64 array of per-zone cell counts, updated in place.
+        """
+        n_zones = sums.shape[0]
+        n_rows = zones.shape[0]
+        n_chunks = max(1, min(get_num_threads(), n_rows))
+        chunk_sums = numpy.zeros((n_chunks, n_zones))
+        chunk_counts = numpy.zeros((n_chunks, n_zones), dtype=numpy.int64)
+
+        for chunk in prange(n_chunks):
+            for i in range(chunk * n_rows // n_chunks, (chunk + 1) * n_rows // n_chunks):
+                for j in range(zones.shape[1]):
+                    zone = zones[i, j]
+                    value = values[i, j]
+                    if 0 < zone < n_zones and not numpy.isnan(value):
+                        chunk_sums[chunk, zone] += value
+                        chunk_counts[chunk, zone] += 1
+
+        for chunk in range(n_chunks):
+            sums += chunk_sums[chunk]
+            counts += chunk_counts[chunk]